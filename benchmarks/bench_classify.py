@@ -0,0 +1,46 @@
+"""
+`names.classify` against trying `AnnotationName` and then `ImageName` for each name.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_classify.py [count]
+"""
+import sys
+import timeit
+
+from names import AnnotationName, ImageName, classify
+
+_NAMES = [
+    'emd_1234.map',
+    'EMD-10052',
+    'empiar_10087_c2_tomo02.mrc',
+    'empiar_10311-20140801_hela-wt_xy5z8nm_as-template_match_aligned_binned_4',
+    'emd_1234-oZRVsrr.hff',
+    'empiar_10310-20180813_platynereis_parapodia-sift_aligned_binned_2-oZRVsrr.sff',
+    'readme.txt',
+]
+
+
+def try_both(names):
+    results = list()
+    for name in names:
+        annotation_name = AnnotationName(name, lazy=True)
+        if annotation_name.matched and annotation_name.noid != '*******' and annotation_name.is_valid():
+            results.append(annotation_name)
+        else:
+            results.append(ImageName(name, lazy=True))
+    return results
+
+
+def single_pass(names):
+    return [classify(name) for name in names]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    names = (_NAMES * (count // len(_NAMES) + 1))[:count]
+    for label, func in [('AnnotationName + ImageName', try_both), ('classify', single_pass)]:
+        best = min(timeit.repeat(lambda: func(names), number=1, repeat=3))
+        print(f"{label:<28} {count / best:>12,.0f} names/s ({best * 1e6 / count:.2f} us/name)")
+
+
+if __name__ == '__main__':
+    main()
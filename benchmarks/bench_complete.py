@@ -0,0 +1,43 @@
+"""
+Building a `names.complete.PrefixIndex` over a synthetic catalogue and completing typed prefixes.
+
+The index is built from the names as strings (each is parsed lazily and kept as a `CompactImageName`); the build time
+and the peak resident set size (RSS) of the process before and after the build are reported.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_complete.py [count]
+"""
+import resource
+import sys
+import time
+import timeit
+
+from names.complete import PrefixIndex
+
+from corpus import generate
+
+
+def _peak_rss():
+    """The peak resident set size of the process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    image_names = list(generate(count, invalid=0, mix={'emdb': 1, 'empiar': 1}))
+    rss = _peak_rss()
+    start = time.perf_counter()
+    index = PrefixIndex(image_names)
+    print(
+        f"built an index of {len(index):,} names in {time.perf_counter() - start:.1f}s; "
+        f"peak RSS {rss / 2 ** 20:,.0f} MiB before, {_peak_rss() / 2 ** 20:,.0f} MiB after"
+    )
+    for prefix in ['e', 'EMD-18', 'emd_1832', 'empiar_1031', 'EMPIAR-10310-', 'xyz']:
+        number = 10_000
+        best = min(timeit.repeat(lambda: index.complete(prefix, k=10), number=number, repeat=3))
+        print(f"{prefix!r:<18} {best * 1e6 / number:>8.1f} us/query ({len(index.complete(prefix, k=10))} names)")
+
+
+if __name__ == '__main__':
+    main()
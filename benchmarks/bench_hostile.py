@@ -0,0 +1,63 @@
+"""
+Worst-case parsing time of hostile names: the compiled regular expressions, default parsing and hardened parsing.
+
+The lazy suffix followed by `\\.*` and repeated extensions backtracks quadratically on long runs of dots; default
+parsing falls back to the regular expression for non-ASCII names. Hardened parsing rejects long, non-ASCII and
+multi-line names and scans the rest so its time stays linear (and, with `MAX_NAME_LENGTH`, bounded); the last
+column lifts the length limit to show the linear scan of long ASCII names.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_hostile.py [longest]
+"""
+import sys
+import time
+
+import names
+from names import ImageName, AnnotationName, IMAGE_NAME_CRE, ANNOTATION_NAME_CRE
+
+_HOSTILE = {
+    'dots': lambda n: 'emd_1234' + '.' * n + 'x',
+    'dots, non-ASCII': lambda n: 'emd_1234' + '.' * n + 'é',
+    'repeated .gz': lambda n: 'emd_1234.map' + '.gz' * (n // 3) + '!',
+    'dots and extensions': lambda n: 'empiar_10087' + '.map.' * (n // 5) + '\n',
+}
+
+
+def _time(func, name):
+    start = time.perf_counter()
+    func(name)
+    return time.perf_counter() - start
+
+
+def _unlimited(cls):
+    def parse(name):
+        limit, names.MAX_NAME_LENGTH = names.MAX_NAME_LENGTH, sys.maxsize
+        try:
+            return cls(name, hardened=True)
+        finally:
+            names.MAX_NAME_LENGTH = limit
+    return parse
+
+
+def main():
+    longest = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    lengths = [250]
+    while lengths[-1] * 2 <= longest:
+        lengths.append(lengths[-1] * 2)
+    headings = ['regex', 'default', 'hardened', 'no limit']
+    print(f"{'input':<22}{'length':>8}" + ''.join(f"{heading:>16}" for heading in headings) + "  (ms; image/annotation)")
+    for label, make in _HOSTILE.items():
+        for n in lengths:
+            name = make(n)
+            columns = list()
+            for funcs in [
+                (IMAGE_NAME_CRE.match, ANNOTATION_NAME_CRE.match),
+                (ImageName, AnnotationName),
+                (lambda x: ImageName(x, hardened=True), lambda x: AnnotationName(x, hardened=True)),
+                (_unlimited(ImageName), _unlimited(AnnotationName)),
+            ]:
+                columns.append('/'.join(f"{_time(func, name) * 1e3:.2f}" for func in funcs))
+            print(f"{label:<22}{len(name):>8}" + ''.join(f"{column:>16}" for column in columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+The time to `import names` (from `python -X importtime`) against a budget.
+
+Each run is a fresh interpreter; the first run (which may write the bytecode cache) is not counted. Exits with
+status 1 if the median is over the budget or if any module which should only be imported on demand was imported.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_import.py [runs] [budget_ms]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# imported only when needed (e.g. noid by is_valid()) or only by optional modules (names.api, names.db)
+_ON_DEMAND = ['noid', 'requests', 'psycopg2', 'logging']
+
+_NAMES_LINE_CRE = re.compile(r'^import time:\s+\d+ \|\s+(?P<cumulative>\d+) \| names$', re.MULTILINE)
+
+
+def import_time():
+    """Microseconds to import names in a fresh interpreter and the on-demand modules it imported"""
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = f"import sys, names; print(','.join(m for m in {_ON_DEMAND!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], env=env, capture_output=True, text=True, check=True
+    )
+    match = _NAMES_LINE_CRE.search(result.stderr)
+    return int(match.group('cumulative')), [m for m in result.stdout.strip().split(',') if m]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    import_time()  # warm the bytecode cache
+    times = list()
+    imported = set()
+    for _ in range(runs):
+        microseconds, modules = import_time()
+        times.append(microseconds / 1000)
+        imported.update(modules)
+    median = statistics.median(times)
+    print(f"import names: median {median:.2f} ms, min {min(times):.2f} ms over {runs} runs (budget {budget_ms} ms)")
+    status = 0
+    if imported:
+        print(f"error: import names imported {', '.join(sorted(imported))}", file=sys.stderr)
+        status = 1
+    if median > budget_ms:
+        print(f"error: import names took {median:.2f} ms > {budget_ms} ms", file=sys.stderr)
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
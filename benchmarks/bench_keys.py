@@ -0,0 +1,33 @@
+"""
+Sorting and range-filtering names by `entry_key` against comparing `(archive, int(entry_id))` tuples.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_keys.py [count]
+"""
+import sys
+import timeit
+
+from names import ImageName, keys
+
+from corpus import generate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    names = [ImageName(name, lazy=True) for name in generate(count, invalid=0, mix={'emdb': 1, 'empiar': 1})]
+    table = keys.key_array(names)  # also caches each name's key
+    sorted_keys = sorted(table)
+    for label, func in [
+        ('sort by (archive, int(entry_id))', lambda: sorted(names, key=lambda name: (name.archive, int(name.entry_id)))),
+        ('keys.sort', lambda: keys.sort(names)),
+        ('filter by archive and int(entry_id)',
+         lambda: [name for name in names if name.archive == 'emdb' and 15000 <= int(name.entry_id) <= 15999]),
+        ('keys.select', lambda: list(keys.select(names, 'emdb', 15000, 15999))),
+        ('keys.search (sorted keys)', lambda: keys.search(sorted_keys, 'emdb', 15000, 15999)),
+    ]:
+        best = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{label:<36} {best * 1e3:>10.2f} ms")
+    print(f"{len(table):,} keys in {table.itemsize * len(table) / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Memory held per parsed name for `ImageName` (eager and lazy) and `CompactImageName`.
+
+Only the memory allocated while parsing is counted i.e. the given names themselves are excluded.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_memory.py [count]
+"""
+import sys
+import tracemalloc
+
+from names import ImageName, CompactImageName
+
+_NAMES = [
+    'emd_1234.map',
+    'EMD-10052',
+    'empiar_10052-ring_1',
+    'empiar_10087_c2_tomo02.mrc',
+    'empiar_10311-20140801_hela-wt_xy5z8nm_as-template_match_aligned_binned_4',
+]
+
+
+def measure(factory, names):
+    tracemalloc.start()
+    objects = [factory(name) for name in names]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / len(names)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    # distinct strings so that nothing is shared between objects
+    names = [''.join(_NAMES[i % len(_NAMES)]) for i in range(count)]
+    for label, factory in [
+        ('ImageName', ImageName),
+        ('ImageName (lazy)', lambda name: ImageName(name, lazy=True)),
+        ('CompactImageName', CompactImageName),
+    ]:
+        print(f"{label:<18} {measure(factory, names):>8.0f} bytes/name")
+
+
+if __name__ == '__main__':
+    main()
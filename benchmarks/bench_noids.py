@@ -0,0 +1,31 @@
+"""
+`names.noids.validate` and `validate_many` (with and without a memo) against `noid.validate`.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_noids.py [count] [distinct]
+"""
+import random
+import sys
+import timeit
+
+import noid
+
+from names import noids
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    pool = [noid.mint(template='zeeeeeek', n=random.randint(0, 1 << 30)) for _ in range(distinct)]
+    _noids = random.choices(pool, k=count)
+    assert noids.validate_many(_noids) == list(map(noid.validate, _noids))
+    for label, func in [
+        ('noid.validate', lambda: list(map(noid.validate, _noids))),
+        ('noids.validate_many', lambda: noids.validate_many(_noids)),
+        ('noids.validate_many (memo)', lambda: noids.validate_many(_noids, memo=dict())),
+    ]:
+        best = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{label:<28} {count / best:>12,.0f} noids/s ({best * 1e9 / count:.0f} ns/noid)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+`names.pairing.pair` against a nested loop over the two listings.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_pairing.py [count]
+"""
+import sys
+import time
+
+from names import ImageName, AnnotationName
+from names.pairing import pair
+
+from corpus import generate
+
+
+def nested_loop(annotations, images):
+    return [(annotation, [image for image in images if image.canonical_name == annotation.canonical_name])
+            for annotation in annotations]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    images = [ImageName(name) for name in generate(count, invalid=0, mix={'emdb': 1, 'empiar': 1})]
+    annotations = [AnnotationName(name) for name in generate(count, invalid=0, mix={'annotation': 1}, seed=1)]
+    for size in [1_000, 10_000, count]:
+        start = time.perf_counter()
+        result = pair(annotations[:size], images[:size])
+        elapsed = time.perf_counter() - start
+        print(f"pair        {size:>10,} x {size:,}: {elapsed:.3f}s ({result})")
+        if size <= 1_000:  # quadratic
+            start = time.perf_counter()
+            nested_loop(annotations[:size], images[:size])
+            print(f"nested loop {size:>10,} x {size:,}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Throughput of `names.parse_many` against building one (eager or lazy) `ImageName` per name.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_parse_many.py [count]
+"""
+import sys
+import timeit
+
+from names import ImageName, parse_many
+
+_NAMES = [
+    'emd_1234.map',
+    'EMD-10052',
+    'test-emd_8750.map.gz',
+    'empiar_10052-ring_1',
+    'empiar_10087_c2_tomo02.mrc',
+    'empiar_10311-20140801_hela-wt_xy5z8nm_as-template_match_aligned_binned_4',
+    'empiar_10442-170821_col-0_r01_294-317um.rec',
+    'not_a_name.txt',
+]
+
+
+def per_object(names):
+    return [ImageName(name) for name in names]
+
+
+def per_lazy_object(names):
+    return [ImageName(name, lazy=True) for name in names]
+
+
+def batch(names):
+    return list(parse_many(names))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    names = (_NAMES * (count // len(_NAMES) + 1))[:count]
+    for label, func in [
+        ('ImageName loop', per_object),
+        ('lazy ImageName', per_lazy_object),
+        ('parse_many', batch),
+    ]:
+        best = min(timeit.repeat(lambda: func(names), number=1, repeat=3))
+        print(f"{label:<16} {count / best:>12,.0f} names/s ({best * 1e6 / count:.2f} us/name)")
+
+
+if __name__ == '__main__':
+    main()
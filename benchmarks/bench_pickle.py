@@ -0,0 +1,62 @@
+"""
+Bytes and time to send parsed names between processes: the compact pickle (the given name and its parts) against
+pickling the whole instance `__dict__` and against sending the string and parsing it again (lazily; unpickled names
+are lazy too).
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_pickle.py [count]
+"""
+import pickle
+import sys
+import timeit
+
+from names import ImageName, AnnotationName
+
+_NAMES = [
+    (ImageName, 'emd_1234.map'),
+    (ImageName, 'empiar_10087_c2_tomo02.mrc'),
+    (ImageName, 'empiar_10311-20140801_hela-wt_xy5z8nm_as-template_match_aligned_binned_4'),
+    (AnnotationName, 'emd_1234-oZRVsrr.hff'),
+    (AnnotationName, 'empiar_10310-20180813_platynereis_parapodia-sift_aligned_binned_2-oZRVsrr.sff'),
+]
+
+
+def _rebuild(cls, state):
+    name = cls.__new__(cls)
+    name.__dict__.update(state)
+    return name
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    pairs = (_NAMES * (count // len(_NAMES) + 1))[:count]
+    names = [cls(name) for cls, name in pairs]
+    strategies = [
+        (
+            'compact pickle',
+            lambda: pickle.dumps(names, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+        ),
+        (
+            'instance __dict__',
+            lambda: pickle.dumps([(type(name), name.__dict__) for name in names], protocol=pickle.HIGHEST_PROTOCOL),
+            lambda data: [_rebuild(cls, state) for cls, state in pickle.loads(data)],
+        ),
+        (
+            'string and parse',
+            lambda: pickle.dumps([(type(name), str(name)) for name in names], protocol=pickle.HIGHEST_PROTOCOL),
+            lambda data: [cls(name, lazy=True) for cls, name in pickle.loads(data)],
+        ),
+    ]
+    scale = 1_000_000 / count
+    for label, dumps, loads in strategies:
+        data = dumps()
+        dumps_time = min(timeit.repeat(dumps, number=1, repeat=3))
+        loads_time = min(timeit.repeat(lambda: loads(data), number=1, repeat=3))
+        print(
+            f"{label:<18} {len(data) * scale / 2 ** 20:>7.1f} MiB, dumps {dumps_time * scale:.2f} s, "
+            f"loads {loads_time * scale:.2f} s per million names"
+        )
+
+
+if __name__ == '__main__':
+    main()
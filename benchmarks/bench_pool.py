@@ -0,0 +1,81 @@
+"""
+Latency of `names.omero.get_image_ids` with a new connection per call against a connection from `names.db`'s pool.
+
+Needs a PostgreSQL database (any will do; if there is no `image` table a stand-in is created before timing and
+dropped afterwards so that both ways run the same query against the same table).
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_pool.py DSN [calls]
+e.g. PYTHONPATH=. python benchmarks/bench_pool.py "dbname=postgres host=localhost" 500
+"""
+import statistics
+import sys
+import time
+
+import psycopg2
+
+from names import ImageName, db, omero
+
+
+def per_call(dsn, image_names):
+    with psycopg2.connect(dsn) as conn:
+        image_ids = omero.get_image_ids(conn, image_names)
+    conn.close()
+    return image_ids
+
+
+def pooled(dsn, image_names):
+    with db.connection(dsn) as conn:
+        return omero.get_image_ids(conn, image_names)
+
+
+def _setup(dsn):
+    """Create a stand-in `image` table if there is none; return whether it was created"""
+    with psycopg2.connect(dsn) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT to_regclass('image')")
+        created = cur.fetchone()[0] is None
+        if created:
+            cur.execute("CREATE TABLE image (id SERIAL PRIMARY KEY, name TEXT)")
+        cur.close()
+    conn.close()
+    return created
+
+
+def _teardown(dsn):
+    with psycopg2.connect(dsn) as conn:
+        cur = conn.cursor()
+        cur.execute("DROP TABLE image")
+        cur.close()
+    conn.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+    dsn = sys.argv[1]
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    image_names = [ImageName('EMD-1832'), ImageName('empiar_10461-survey_image_binned_4')]
+    created = _setup(dsn)
+    try:
+        db.get_pool(dsn, minconn=1, maxconn=4)
+        for label, func in [('connection per call', per_call), ('pooled connection', pooled)]:
+            latencies = list()
+            for _ in range(calls):
+                start = time.perf_counter()
+                func(dsn, image_names)
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            print(
+                f"{label:<20} median {statistics.median(latencies) * 1e3:.2f} ms, "
+                f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e3:.2f} ms"
+            )
+    finally:
+        db.close_all()
+        if created:
+            _teardown(dsn)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Files per second for `names.scan.scan_tree` over a synthetic EMDB tree (or an existing tree) and the time taken by
+`names.scan.Snapshot.update` with no changes and with a few new files.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_scan.py [entries | ROOT]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from names import ImageName
+from names.scan import Snapshot, scan_tree
+
+
+def make_tree(root, entries):
+    for entry_id in range(10000, 10000 + entries):
+        image_name = ImageName(f"emd_{entry_id}")
+        directory = os.path.join(root, image_name.entry_subtree)
+        os.makedirs(directory, exist_ok=True)
+        for ext in ['map', 'mrc', 'map.gz']:
+            open(os.path.join(directory, f"{image_name.canonical_name}.{ext}"), 'w').close()
+    # as if the tree had been written an hour ago (recently modified directories are always listed again)
+    past = time.time() - 3600
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, (past, past))
+
+
+def bench_snapshot(root, changes):
+    with tempfile.TemporaryDirectory() as tmp, Snapshot(os.path.join(tmp, 'snapshot.sqlite'), root) as snapshot:
+        for label in ['first update', 'no changes', f'{len(changes)} new files']:
+            if label.endswith('new files'):
+                for path in changes:
+                    open(path, 'w').close()
+            start = time.perf_counter()
+            events = snapshot.update()
+            print(f"snapshot {label:<16} {time.perf_counter() - start:.2f}s ({len(events)} changes)")
+        for path in changes:
+            os.unlink(path)
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '5000'
+    if os.path.isdir(arg):
+        root, cleanup = arg, False
+    else:
+        root, cleanup = tempfile.mkdtemp(), True
+        make_tree(root, int(arg))
+    try:
+        for jobs in [1, 4, 16]:
+            print(f"jobs={jobs:<3} {scan_tree(root, jobs=jobs)}")
+        if cleanup:
+            changes = [os.path.join(root, ImageName(f"emd_{entry_id}").entry_subtree, f"emd_{entry_id}.tif")
+                       for entry_id in range(10000, 10010)]
+            bench_snapshot(root, changes)
+    finally:
+        if cleanup:
+            shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
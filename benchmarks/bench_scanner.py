@@ -0,0 +1,33 @@
+"""
+Speed of the single-scan parser against the compiled regular expressions it stands in front of (both give the
+parts of the name as a tuple).
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/bench_scanner.py [repeat]
+"""
+import sys
+import timeit
+
+from names import IMAGE_NAME_CRE, ANNOTATION_NAME_CRE, _SCANNERS
+
+_NAMES = {
+    'short': 'emd_1234.map',
+    'long': 'empiar_10311-20140801_hela-wt_xy5z8nm_as-template_match_aligned_binned_4',
+    'long + ext': 'empiar_10311-20140801_hela-wt_xy5z8nm_as-template_match_aligned_binned_4.mrc.gz',
+    'annotation': 'empiar_10310-20180813_platynereis_parapodia-sift_aligned_binned_2-oZRVsrr.sff',
+}
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for cre in [IMAGE_NAME_CRE, ANNOTATION_NAME_CRE]:
+        scanner = _SCANNERS[cre]
+        for label, name in _NAMES.items():
+            regex = min(timeit.repeat(lambda: scanner._match(name), number=number, repeat=3)) / number
+            scan = min(timeit.repeat(lambda: scanner.parse(name), number=number, repeat=3)) / number
+            kind = 'image' if cre is IMAGE_NAME_CRE else 'annotation'
+            print(f"{kind:<10} {label:<12} regex {regex * 1e6:6.2f} us  fast path {scan * 1e6:6.2f} us  "
+                  f"({regex / scan:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Generate a synthetic corpus of EMDB/EMPIAR image and annotation names
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/corpus.py [--count N] [--invalid FRACTION] [--mix emdb=4,empiar=3,annotation=3]
+        [--seed SEED] > names.txt
+
+Valid names come in the forms the package accepts (mixed case, '-' or '_' separators, 'test-' prefixes, 4- and
+5-digit EMDB ids, qualifiers, with and without extensions and '.gz'). Invalid names are near misses: wrong prefixes,
+ids of the wrong length, unknown extensions and annotations whose noid fails its check digit.
+"""
+import argparse
+import random
+import sys
+
+import noid
+
+from names import noids
+from names._corpus import EXOTIC_IMAGE_NAMES  # noqa: F401 shared with the tests
+
+_WORDS = [
+    'tomo', 'binned', 'roi', 'aligned', 'raw', 'hela', 'ring', 'sample', 'headright', 'cropped', 'schizont', 'c2',
+    'anaphase', 'platynereis', 'amst', 'sift', '8bit', 'dynamin', 'col-0', 'man',
+]
+
+
+def _separator(rng):
+    return rng.choice('_-')
+
+
+def _prefix(rng, prefix):
+    if rng.random() < 0.2:
+        prefix = prefix.upper()
+    if rng.random() < 0.05:
+        prefix = f"test-{prefix}"
+    return f"{prefix}{_separator(rng)}"
+
+
+def _qualifier(rng):
+    words = [rng.choice(_WORDS) if rng.random() < 0.7 else str(rng.randint(1, 99999)) for _ in range(rng.randint(1, 6))]
+    return _separator(rng) + '_'.join(words)
+
+
+def _noid(rng, valid=True):
+    body = ''.join(rng.choices(noid.utils.XDIGIT, k=6))
+    digit = noids.check_digit(body)
+    if not valid:
+        digit = rng.choice([c for c in noid.utils.XDIGIT if c != digit])
+    return body + digit
+
+
+def _emdb(rng):
+    entry_id = rng.randint(1000, 99999)
+    ext = rng.choice(['.map', '.mrc', '.map.gz', '.mrc.gz', ''])
+    return f"{_prefix(rng, 'emd')}{entry_id}{ext}"
+
+
+def _empiar(rng):
+    ext = rng.choice(['.mrc', '.rec', '.st', '.map', '.mrc.gz', ''])
+    qualifier = _qualifier(rng) if rng.random() < 0.8 else ''
+    return f"{_prefix(rng, 'empiar')}{rng.randint(10000, 99999)}{qualifier}{ext}"
+
+
+def _annotation(rng, valid=True):
+    if rng.random() < 0.5:
+        canonical_name = f"emd_{rng.randint(1000, 99999)}"
+    else:
+        qualifier = _qualifier(rng) if rng.random() < 0.8 else ''
+        canonical_name = f"empiar_{rng.randint(10000, 99999)}{qualifier}"
+    ext = rng.choice(['.sff', '.hff', '.json', '.xml', '.h5', ''])
+    return f"{canonical_name}-{_noid(rng, valid=valid)}{ext}"
+
+
+def _invalid(rng):
+    kind = rng.randrange(5)
+    if kind == 0:
+        return f"emd{_separator(rng)}{rng.randint(1, 999)}.map"  # too few digits
+    if kind == 1:
+        return f"empiar{_separator(rng)}{rng.randint(1000, 9999)}{_qualifier(rng)}.mrc"  # too few digits
+    if kind == 2:
+        return f"{rng.choice(['emb', 'empire', 'pdb'])}_{rng.randint(1000, 99999)}.map"  # wrong prefix
+    if kind == 3:
+        return f"emd_{rng.randint(1000, 99999)}.{rng.choice(['txt', 'tif', 'png'])}"  # unknown extension
+    return _annotation(rng, valid=False)  # bad check digit
+
+
+_GENERATORS = {
+    'emdb': _emdb,
+    'empiar': _empiar,
+    'annotation': _annotation,
+}
+
+
+def generate(count, invalid=0.1, mix=None, seed=0):
+    """Generate `count` names
+
+    :param int count: the number of names
+    :param float invalid: the fraction of invalid names
+    :param dict mix: relative weights of 'emdb', 'empiar' and 'annotation' names [default: 4, 3, 3]
+    :param seed: the random seed; the same seed gives the same corpus
+    :return: yields names
+    """
+    if not 0 <= invalid <= 1:
+        raise ValueError(f"invalid fraction {invalid}; should be between 0 and 1")
+    mix = mix or {'emdb': 4, 'empiar': 3, 'annotation': 3}
+    for kind in mix:
+        if kind not in _GENERATORS:
+            raise ValueError(f"invalid kind '{kind}'; should be one of {', '.join(_GENERATORS)}")
+    rng = random.Random(seed)
+    generators = [_GENERATORS[kind] for kind in mix]
+    weights = list(mix.values())
+    for _ in range(count):
+        if rng.random() < invalid:
+            yield _invalid(rng)
+        else:
+            yield rng.choices(generators, weights)[0](rng)
+
+
+def parse_mix(mix):
+    """Parse 'emdb=4,empiar=3,annotation=3' into a dictionary"""
+    result = dict()
+    for item in mix.split(','):
+        kind, _, weight = item.partition('=')
+        result[kind.strip()] = float(weight)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus of EMDB/EMPIAR names")
+    parser.add_argument('-n', '--count', type=int, default=1_000_000, help="number of names [default: 1000000]")
+    parser.add_argument('-i', '--invalid', type=float, default=0.1, help="fraction of invalid names [default: 0.1]")
+    parser.add_argument('-m', '--mix', default='emdb=4,empiar=3,annotation=3', help="relative weights of kinds")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="random seed [default: 0]")
+    args = parser.parse_args()
+    write = sys.stdout.write
+    for name in generate(args.count, invalid=args.invalid, mix=parse_mix(args.mix), seed=args.seed):
+        write(f"{name}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Throughput of parsing, `entry_subtree` and `is_valid` over realistic corpora with machine-readable baselines
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/suite.py [--count N] [--save baseline.json] [--compare baseline.json]
+
+Each benchmark reports names per second (best of `--repeat` runs) over a synthetic corpus (see `corpus.py`) or over
+the exotic EMPIAR names shared with the test suite (`corpus.EXOTIC_IMAGE_NAMES`). `--save` writes the results as
+JSON; `--compare` compares them with a saved baseline and exits with status 1 if any benchmark is slower than the
+baseline by more than `--tolerance`.
+Baselines are only comparable on the same machine and Python.
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+import noid
+
+import corpus
+from names import ImageName, AnnotationName
+
+
+def _corpora(count, seed):
+    images = list(corpus.generate(count, invalid=0.1, mix={'emdb': 1, 'empiar': 1}, seed=seed))
+    annotations = list(corpus.generate(count, invalid=0.1, mix={'annotation': 1}, seed=seed))
+    exotic_images = (corpus.EXOTIC_IMAGE_NAMES * (count // len(corpus.EXOTIC_IMAGE_NAMES) + 1))[:count]
+    exotic_annotations = [f"{name}-{noid.mint(template='zeeeeeek', n=i)}.sff" for i, name in enumerate(exotic_images)]
+    return images, annotations, exotic_images, exotic_annotations
+
+
+def _benchmarks(count, seed):
+    images, annotations, exotic_images, exotic_annotations = _corpora(count, seed)
+    lazy_annotations = [AnnotationName(name, lazy=True) for name in annotations]
+    lazy_annotations = [name for name in lazy_annotations if name.matched and name.noid != '*******']
+    return {
+        'ImageName': (images, lambda: [ImageName(name) for name in images]),
+        'ImageName (lazy)': (images, lambda: [ImageName(name, lazy=True) for name in images]),
+        'ImageName (exotic)': (exotic_images, lambda: [ImageName(name) for name in exotic_images]),
+        'AnnotationName': (annotations, lambda: [AnnotationName(name) for name in annotations]),
+        'AnnotationName (exotic)': (exotic_annotations, lambda: [AnnotationName(name) for name in exotic_annotations]),
+        'entry_subtree': (images, lambda: [ImageName(name, lazy=True).entry_subtree for name in images]),
+        'is_valid': (lazy_annotations, lambda: [name.is_valid() for name in lazy_annotations]),
+    }
+
+
+def run(count=100_000, repeat=3, seed=0):
+    """Run all benchmarks
+
+    :return dict: the environment and the names per second of each benchmark
+    """
+    results = dict()
+    for label, (names, func) in _benchmarks(count, seed).items():
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        results[label] = round(len(names) / best)
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'count': count,
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Compare results with a baseline
+
+    :return list: descriptions of the benchmarks which regressed by more than `tolerance` (a fraction)
+    """
+    regressions = list()
+    for label, rate in current['results'].items():
+        baseline_rate = baseline['results'].get(label)
+        if baseline_rate and rate < baseline_rate * (1 - tolerance):
+            regressions.append(
+                f"{label}: {rate:,} names/s < {baseline_rate:,} names/s (-{1 - rate / baseline_rate:.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the names package")
+    parser.add_argument('-n', '--count', type=int, default=100_000, help="names per corpus [default: 100000]")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="runs per benchmark (best is kept) [default: 3]")
+    parser.add_argument('--save', metavar='FILE', help="write the results to FILE as JSON")
+    parser.add_argument('--compare', metavar='FILE', help="compare the results with the baseline in FILE")
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2, help="allowed slowdown relative to the baseline [default: 0.2]"
+    )
+    args = parser.parse_args()
+    current = run(count=args.count, repeat=args.repeat)
+    for label, rate in current['results'].items():
+        print(f"{label:<24} {rate:>12,} names/s ({1e6 / rate:.2f} us/name)")
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
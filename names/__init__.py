@@ -1,8 +1,18 @@
+import collections
 import re
-import sys
+import time
 import warnings
 
-import noid
+from . import keys
+from . import noids
+from .cache import LRUCache
+
+
+def _logger():
+    """The 'names' logger; `logging` is only imported when something is logged"""
+    import logging
+    return logging.getLogger(__name__)
+
 
 """
 EMDB_CRE = re.compile(r'^(test-)*emd[-_](?P<entry_id>\d{4,5})\.*(map|mrc|tif|tiff)*(\.gz)*$', re.IGNORECASE)
@@ -27,13 +37,271 @@ ANNOTATION_NAME_CRE = re.compile(
 # For annotations the suffix contains the qualifier and the noid (nice opaque ID)
 _NOID_CRE = re.compile(r'(?P<qualifier>.*)-(?P<noid>\w{7})$')
 
+_KIND_CRES = {
+    'image': IMAGE_NAME_CRE,
+    'annotation': ANNOTATION_NAME_CRE,
+}
+
+
+# names up to this length are matched with the compiled regular expressions; they backtrack very little
+_SHORT_NAME = 16
+
+# the longest name accepted in hardened mode (the usual limit on the length of a file name)
+MAX_NAME_LENGTH = 255
+
+
+class _Scanner:
+    """A single-scan (linear time) parser for names which gives exactly the same parts as a compiled regular expression
+
+    The prefixes and extensions must be the alternatives in the compiled regular expression. Only long ASCII names
+    without newlines are scanned; anything else uses the compiled regular expression e.g. because `\\d` matches
+    non-ASCII digits.
+    """
+
+    def __init__(self, cre, prefixes, exts, gz):
+        self.cre = cre
+        self.prefixes = frozenset(prefixes)
+        # at most one prefix can be followed by a separator at any position so we only need the lengths
+        self.prefix_lengths = sorted({len(prefix) for prefix in prefixes})
+        # extensions keyed by their last character; '.gz' is handled separately
+        self.exts = dict()
+        for ext in exts:
+            self.exts.setdefault(ext[-1], []).append(ext)
+        self.gz = gz
+
+    def parse(self, name):
+        """Get `(is_test, prefix, entry_id, suffix, ext)` or `None` if the name does not match"""
+        # the compiled regular expression is quicker for short names
+        if len(name) <= _SHORT_NAME or not name.isascii() or '\n' in name:
+            return self._match(name)
+        return self.scan(name)
+
+    def parse_hardened(self, name):
+        """Like `parse()` but in linear time whatever the name
+
+        Names longer than `MAX_NAME_LENGTH` or with non-ASCII characters or newlines do not match; all other names are
+        scanned so the compiled regular expression (which backtracks badly on e.g. long runs of dots) is never used.
+        """
+        if len(name) > MAX_NAME_LENGTH or not name.isascii() or '\n' in name:
+            return None
+        return self.scan(name)
+
+    def scan(self, name):
+        """Scan an ASCII name without newlines"""
+        lower = name.lower()
+        # (test-)*
+        pos = 0
+        while lower.startswith('test-', pos):
+            pos += 5
+        # (?P<prefix>...)[-_]
+        for length in self.prefix_lengths:
+            end = pos + length
+            if name[end:end + 1] in ('-', '_'):
+                break
+        else:
+            return None
+        if lower[pos:end] not in self.prefixes:
+            return None
+        # (?P<entry_id>\d{4,5}) is greedy and the rest of the expression always matches
+        start = end + 1
+        digits = name[start:start + 5]
+        suffix_start = start + len(digits) - len(digits.lstrip('0123456789'))
+        if suffix_start - start < 4:
+            return None
+        suffix_end, ext_start = self._split_ext(name, lower, suffix_start)
+        return (
+            pos > 0,
+            name[pos:end],
+            name[start:suffix_start],
+            name[suffix_start:suffix_end],
+            name[ext_start:] if ext_start < len(name) else None,
+        )
+
+    def _split_ext(self, name, lower, suffix_start):
+        """Find where the suffix ends and the extension starts
+
+        The suffix is lazy so the extension is the longest run of extensions ending the name; the run is unique so we
+        collect it from the right.
+        """
+        size = len(name)
+        ext_start = suffix_end = size
+        exts = self.exts
+        while suffix_end > suffix_start:
+            token_end = suffix_end
+            if self.gz:
+                while lower.endswith('.gz', suffix_start, token_end):
+                    token_end -= 3
+            for ext in exts.get(lower[token_end - 1], ()):
+                if lower.endswith(ext, suffix_start, token_end):
+                    break
+            else:
+                break
+            suffix_end = token_end - len(ext)
+            if ext_start == size:
+                ext_start = suffix_end
+        # \.* between the suffix and the extensions
+        while suffix_end > suffix_start and name[suffix_end - 1] == '.':
+            suffix_end -= 1
+        return suffix_end, ext_start
+
+    def _match(self, name):
+        m = self.cre.match(name)
+        if m is None:
+            return None
+        test, prefix, entry_id, suffix, ext = m.group(1, 'prefix', 'entry_id', 'suffix', 'ext')
+        return test is not None, prefix, entry_id, suffix, ext
+
+
+_SCANNERS = {
+    IMAGE_NAME_CRE: _Scanner(IMAGE_NAME_CRE, ('empiar', 'emp', 'emd', 'emdb'), ('map', 'mrc', 'rec', 'st'), gz=True),
+    ANNOTATION_NAME_CRE: _Scanner(
+        ANNOTATION_NAME_CRE, ('emd', 'empiar'), ('sff', 'hff', 'json', 'xml', 'h5', 'hdf5'), gz=False
+    ),
+}
+
+
+def parse_many(names, kind='image', hardened=False):
+    """Parse an iterable of names without building a `Name` object for each
+
+    For each name we yield either `None` (no match) or a tuple `(is_test, prefix, entry_id, suffix, ext)` of the
+    groups captured by `IMAGE_NAME_CRE` or `ANNOTATION_NAME_CRE`; `ext` is `None` if the name has no extension.
+    Results are yielded lazily and in the same order as the given names.
+
+    :param names: an iterable of strings
+    :param str kind: either 'image' or 'annotation'
+    :param bool hardened: parse untrusted names in linear time (see `Name.__init__`)
+    """
+    try:
+        cre = _KIND_CRES[kind]
+    except KeyError:
+        raise ValueError(f"invalid kind '{kind}'; should be one of {', '.join(_KIND_CRES)}")
+    scanner = _SCANNERS[cre]
+    return map(scanner.parse_hardened if hardened else scanner.parse, names)
+
+
+Classification = collections.namedtuple(
+    'Classification', ['kind', 'archive', 'is_test', 'prefix', 'entry_id', 'suffix', 'ext', 'qualifier', 'noid']
+)
+
+
+def classify(name, hardened=False):
+    """Decide whether a name is an EMDB/EMPIAR image or annotation parsing it only once
+
+    The name is parsed as an image (`IMAGE_NAME_CRE`) and the suffix is then checked for annotation extensions. A name
+    is an annotation if it has an EMDB/EMPIAR prefix and either has an annotation extension e.g. `sff` or has no
+    extension but ends with a valid noid e.g. 'emd_1234-oZRVsrr'. The parts are the same as those given by
+    `IMAGE_NAME_CRE` or `ANNOTATION_NAME_CRE` (including `ext`, which is `None` if the name has no extension).
+
+    :param str name: the name to classify
+    :param bool hardened: parse an untrusted name in linear time (see `Name.__init__`)
+    :return: a `Classification` named tuple with `kind` either 'image' or 'annotation' and `archive` either 'emdb' or
+        'empiar' or `None` if the name is neither
+    """
+    if hardened:
+        groups = _SCANNERS[IMAGE_NAME_CRE].parse_hardened(name)
+    else:
+        groups = _SCANNERS[IMAGE_NAME_CRE].parse(name)
+    if groups is None:
+        return None
+    is_test, prefix, entry_id, suffix, ext = groups
+    _prefix = prefix.lower()
+    archive = 'empiar' if _prefix in ('empiar', 'emp') else 'emdb'
+    if ext is None and _prefix in ('emd', 'empiar'):
+        annotation_scanner = _SCANNERS[ANNOTATION_NAME_CRE]
+        # the image suffix ends the name unless trailing dots were dropped from it; annotation extensions must end the
+        # name so only then is it split
+        if suffix.isascii() and '\n' not in suffix and not name.endswith('.'):
+            suffix_end, ext_start = annotation_scanner._split_ext(suffix, suffix.lower(), 0)
+            annotation_suffix = suffix[:suffix_end]
+            annotation_ext = suffix[ext_start:] if ext_start < len(suffix) else None
+        elif hardened:
+            _, _, _, annotation_suffix, annotation_ext = annotation_scanner.scan(name)
+        else:
+            _, _, _, annotation_suffix, annotation_ext = annotation_scanner.parse(name)
+        suffix_match = _NOID_CRE.match(annotation_suffix)
+        if annotation_ext is not None or (suffix_match and noids.validate(suffix_match.group('noid'))):
+            if suffix_match:
+                qualifier, _noid = suffix_match.group('qualifier', 'noid')
+            else:
+                qualifier, _noid = '', '*******'  # invalid
+            return Classification(
+                'annotation', archive, is_test, prefix, entry_id, annotation_suffix, annotation_ext, qualifier, _noid
+            )
+    return Classification('image', archive, is_test, prefix, entry_id, suffix, ext, None, None)
+
+
+def _from_tuple(cls, data):
+    """Unpickle a name"""
+    return cls.from_tuple(data)
+
+
+class _derived:
+    """A name derived from the parts of a parsed name
+
+    The value is computed on first access and cached on the instance; names which failed to match have `None`.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def compute(self, instance):
+        if instance.archive is None:
+            return None
+        return self.func(instance)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.compute(instance)
+        return value
+
 
 class Name:
     ext = None
     CRE = None
-
-    def __init__(self, given_name, verbose=False):
-        """"""
+    # shared, read-only names returned by `cached()`
+    cache = None
+    _compact_class = None
+    # a `metrics.Metrics` when collecting metrics (see `metrics.enable()`)
+    metrics = None
+    _kind = None
+    # the attributes of interest; all are derived from the parts of the name
+    _derived_attrs = (
+        'canonical_name',
+        'uppercase_hyphen_name',
+        'lowercase_hyphen_name',
+        'uppercase_underscore_name',
+        'lowercase_underscore_name',
+        'full_name_upper',
+        'full_name_lower',
+        'file_name',
+    )
+
+    def __init__(self, given_name, verbose=False, lazy=False, hardened=False):
+        """Parse the given name
+
+        :param str given_name: the name to parse
+        :param bool verbose: log the match (or failure to match) to the 'names' logger
+        :param bool lazy: only keep the parts of the name and compute each derived name e.g. `canonical_name` on
+            first access; by default all derived names are computed immediately
+        :param bool hardened: for untrusted names (e.g. uploads): parse in time linear in the length of the name;
+            names longer than `MAX_NAME_LENGTH` or with non-ASCII characters or newlines do not match
+        """
+        scanner = _SCANNERS[self.CRE]
+        parse = scanner.parse_hardened if hardened else scanner.parse
+        if Name.metrics is None:
+            self._load(given_name, parse(given_name), verbose)
+        else:
+            start = time.perf_counter()
+            self._load(given_name, parse(given_name), verbose)
+            Name.metrics.record(self, time.perf_counter() - start)
+        if not lazy:
+            self._derive()
+
+    def _load(self, given_name, groups, verbose=False):
+        """Set the parts of the name from the groups found by the scanner (or `None`)"""
         self._given_name = given_name
         self._verbose = verbose
         # private attrs
@@ -42,26 +310,81 @@ class Name:
         self.prefix = None
         self.entry_id = None
         self.suffix = None
-        # the attributes of interest
-        self.canonical_name = None
-        self.uppercase_hyphen_name = None
-        self.lowercase_hyphen_name = None
-        self.uppercase_underscore_name = None
-        self.lowercase_underscore_name = None
-        self.full_name_upper = None
-        self.full_name_lower = None
-        self.file_name = None
-        # match
-        self._match = self.CRE.match(given_name)
+        # the parts of the name (or None)
+        self._groups = groups
         self._eval()
 
+    def to_tuple(self):
+        """The given name and its parts: all that is needed to rebuild the name with `from_tuple()`"""
+        return self._given_name, self._groups
+
+    @classmethod
+    def from_tuple(cls, data):
+        """Rebuild a (lazy) name from `to_tuple()` without parsing it again"""
+        name = cls.__new__(cls)
+        name._load(*data)
+        return name
+
+    def __reduce__(self):
+        # pickle only the given name and its parts
+        return _from_tuple, (type(self), self.to_tuple())
+
+    @classmethod
+    def cached(cls, given_name):
+        """Get a shared, read-only (compact) name for the given name from a bounded LRU cache
+
+        Use `cache.info()` for hit/miss statistics and `cache.resize(maxsize)` to change the size of the cache.
+        """
+        return cls.cache.get(given_name, cls._compact_class)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._derivations = tuple((attr, getattr(cls, attr).func) for attr in cls._derived_attrs)
+
+    def _derive(self):
+        """Compute all derived names at once"""
+        d = self.__dict__
+        if self.archive is None:
+            for attr in self._derived_attrs:
+                d[attr] = None
+        else:
+            for attr, func in self._derivations:
+                d[attr] = func(self)
+
     @property
     def matched(self):
-        return bool(self._match)
+        return self._groups is not None
 
     def _eval(self):
         raise NotImplementedError
 
+    @_derived
+    def uppercase_hyphen_name(self):
+        return f"{self.prefix.upper()}-{self.entry_id}"
+
+    @_derived
+    def lowercase_hyphen_name(self):
+        return f"{self.prefix.lower()}-{self.entry_id}"
+
+    @_derived
+    def uppercase_underscore_name(self):
+        return f"{self.prefix.upper()}_{self.entry_id}"
+
+    @_derived
+    def lowercase_underscore_name(self):
+        return f"{self.prefix.lower()}_{self.entry_id}"
+
+    @_derived
+    def entry_key(self):
+        """The archive, entry id and test flag packed into an integer (see `names.keys`)"""
+        return keys.pack(self.archive, self.entry_id, self._test)
+
+    @_derived
+    def file_name(self):
+        if self._given_name.endswith(self.ext):
+            return self._given_name
+        return f"{self._given_name}.{self.ext}"
+
     @property
     def entry_subtree(self):
         raise NotImplementedError
@@ -78,41 +401,39 @@ class ImageName(Name):
     """Parse entry image names i.e. EMDB and EMPIAR images"""
     ext = 'map'
     CRE = IMAGE_NAME_CRE
+    cache = LRUCache(maxsize=4096)
+    _kind = 'image'
 
     def _eval(self):
-        if self._match:
+        if self._groups:
             if self._verbose:
-                print(f"info: {self._match}", file=sys.stderr)
-            mg = self._match.group
-            if mg(1):
-                self._test = True
-            self.entry_id = mg('entry_id')
-            self.suffix = mg('suffix')
-            self.prefix = mg('prefix')
-            self.ext = mg('ext')
+                _logger().info("matched '%s' as %s", self._given_name, self._groups)
+            self._test, self.prefix, self.entry_id, self.suffix, self.ext = self._groups
             if self.prefix.lower() in ['empiar', 'emp']:
                 if self.ext is None:
                     self.ext = "mrc"
                 self.archive = 'empiar'
-                self.canonical_name = f"{self.prefix.lower()}_{self.entry_id}{self.suffix}"
             else:
                 if self.ext is None:
                     self.ext = "map"
                 self.archive = 'emdb'
-                self.canonical_name = f"{self.prefix.lower()}_{self.entry_id}"
-            self.uppercase_hyphen_name = f"{self.prefix.upper()}-{self.entry_id}"
-            self.uppercase_underscore_name = f"{self.prefix.upper()}_{self.entry_id}"
-            self.lowercase_hyphen_name = f"{self.prefix.lower()}-{self.entry_id}"
-            self.lowercase_underscore_name = f"{self.prefix.lower()}_{self.entry_id}"
-            self.full_name_upper = f"{self.prefix.upper()}-{self.entry_id}{self.suffix.upper()}"
-            self.full_name_lower = f"{self.prefix.lower()}-{self.entry_id}{self.suffix.lower()}"
-            if self._given_name.endswith(self.ext):
-                self.file_name = self._given_name
-            else:
-                self.file_name = f"{self._given_name}.{self.ext}"
         else:
             if self._verbose:
-                print(f"error: failed to match '{self._given_name}'", file=sys.stderr)
+                _logger().error("failed to match '%s'", self._given_name)
+
+    @_derived
+    def canonical_name(self):
+        if self.archive == 'empiar':
+            return f"{self.prefix.lower()}_{self.entry_id}{self.suffix}"
+        return f"{self.prefix.lower()}_{self.entry_id}"
+
+    @_derived
+    def full_name_upper(self):
+        return f"{self.prefix.upper()}-{self.entry_id}{self.suffix.upper()}"
+
+    @_derived
+    def full_name_lower(self):
+        return f"{self.prefix.lower()}-{self.entry_id}{self.suffix.lower()}"
 
     @property
     def id_only(self):
@@ -184,22 +505,20 @@ class AnnotationName(Name):
     """
     ext = 'sff'
     CRE = ANNOTATION_NAME_CRE
+    cache = LRUCache(maxsize=4096)
+    _kind = 'annotation'
+    _derived_attrs = Name._derived_attrs + ('annotation_name',)
 
-    def __init__(self, *args, **kwargs):
-        self.annotation_name = None
+    def _load(self, *args, **kwargs):
         self.qualifier = None
         self.noid = None
-        super().__init__(*args, **kwargs)
+        super()._load(*args, **kwargs)
 
     def _eval(self):
-        if self._match:
+        if self._groups:
             if self._verbose:
-                print(f"info: {self._match}", file=sys.stderr)
-            mg = self._match.group
-            if mg(1):
-                self._test = True
-            self.entry_id = mg('entry_id')
-            self.suffix = mg('suffix')
+                _logger().info("matched '%s' as %s", self._given_name, self._groups)
+            self._test, self.prefix, self.entry_id, self.suffix, ext = self._groups
             suffix_match = _NOID_CRE.match(self.suffix)
             if suffix_match:
                 self.qualifier = suffix_match.group('qualifier')
@@ -208,32 +527,34 @@ class AnnotationName(Name):
             else:
                 self.qualifier = ''
                 self.noid = '*******'  # invalid
-            self.prefix = mg('prefix')
             if self.prefix.lower() == 'empiar':
                 self.archive = 'empiar'
-                self.canonical_name = f"{self.prefix.lower()}_{self.entry_id}{self.qualifier}"
-                self.annotation_name = f"{self.canonical_name}-{self.noid}"
             else:
                 self.archive = 'emdb'
-                self.canonical_name = f"{self.prefix.lower()}_{self.entry_id}"
-                self.annotation_name = f"{self.canonical_name}-{self.noid}"
-            self.uppercase_hyphen_name = f"{self.prefix.upper()}-{self.entry_id}"
-            self.uppercase_underscore_name = f"{self.prefix.upper()}_{self.entry_id}"
-            self.lowercase_hyphen_name = f"{self.prefix.lower()}-{self.entry_id}"
-            self.lowercase_underscore_name = f"{self.prefix.lower()}_{self.entry_id}"
-            self.full_name_upper = f"{self.prefix.upper()}-{self.entry_id}{self.qualifier.upper()}-{self.noid}"
-            self.full_name_lower = f"{self.prefix.lower()}-{self.entry_id}{self.qualifier.lower()}-{self.noid}"
-            ext = mg('ext')
             if ext is None:
                 ext = "sff"
-            if self._given_name.endswith(ext):
-                self.file_name = self._given_name
-            else:
-                self.file_name = f"{self._given_name}.{ext}"
             self.ext = ext
         else:
             if self._verbose:
-                print(f"error: failed to match '{self._given_name}'", file=sys.stderr)
+                _logger().error("failed to match '%s'", self._given_name)
+
+    @_derived
+    def canonical_name(self):
+        if self.archive == 'empiar':
+            return f"{self.prefix.lower()}_{self.entry_id}{self.qualifier}"
+        return f"{self.prefix.lower()}_{self.entry_id}"
+
+    @_derived
+    def annotation_name(self):
+        return f"{self.canonical_name}-{self.noid}"
+
+    @_derived
+    def full_name_upper(self):
+        return f"{self.prefix.upper()}-{self.entry_id}{self.qualifier.upper()}-{self.noid}"
+
+    @_derived
+    def full_name_lower(self):
+        return f"{self.prefix.lower()}-{self.entry_id}{self.qualifier.lower()}-{self.noid}"
 
     @property
     def entry_subtree(self):
@@ -251,4 +572,112 @@ class AnnotationName(Name):
 
     def is_valid(self):
         """Validate the noid"""
-        return noid.validate(self.noid)
+        return noids.validate(self.noid)
+
+
+class CompactName:
+    """A compact, read-only copy of a parsed name
+
+    Only the parts of the name are kept (in slots) and there is no instance `__dict__`. Derived names
+    (`canonical_name` etc.) are computed on every access so that they take no space.
+    """
+    __slots__ = ('_given_name', '_test', 'archive', 'prefix', 'entry_id', 'suffix', 'ext')
+    _fields = __slots__
+    _name_class = None
+
+    def __init__(self, given_name):
+        self._load(self._name_class(given_name, lazy=True))
+
+    @classmethod
+    def from_name(cls, name):
+        """Create a compact name from a `Name` object"""
+        compact_name = cls.__new__(cls)
+        compact_name._load(name)
+        return compact_name
+
+    def _load(self, name):
+        for field in self._fields:
+            object.__setattr__(self, field, getattr(name, field))
+
+    def to_tuple(self):
+        """The fields of the name: all that is needed to rebuild it with `from_tuple()`"""
+        return self._astuple()
+
+    @classmethod
+    def from_tuple(cls, data):
+        """Rebuild a compact name from `to_tuple()` without parsing it again"""
+        compact_name = cls.__new__(cls)
+        for field, value in zip(cls._fields, data):
+            object.__setattr__(compact_name, field, value)
+        return compact_name
+
+    def __reduce__(self):
+        return _from_tuple, (type(self), self.to_tuple())
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    @property
+    def matched(self):
+        return self.archive is not None
+
+    @property
+    def is_test(self):
+        return self._test
+
+    uppercase_hyphen_name = property(Name.uppercase_hyphen_name.compute)
+    lowercase_hyphen_name = property(Name.lowercase_hyphen_name.compute)
+    uppercase_underscore_name = property(Name.uppercase_underscore_name.compute)
+    lowercase_underscore_name = property(Name.lowercase_underscore_name.compute)
+    file_name = property(Name.file_name.compute)
+    entry_key = property(Name.entry_key.compute)
+
+    def _astuple(self):
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __hash__(self):
+        return hash(self._astuple())
+
+    def __str__(self):
+        return self._given_name
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._given_name!r})"
+
+
+class CompactImageName(CompactName):
+    """A compact, read-only `ImageName`"""
+    __slots__ = ()
+    _name_class = ImageName
+
+    canonical_name = property(ImageName.canonical_name.compute)
+    full_name_upper = property(ImageName.full_name_upper.compute)
+    full_name_lower = property(ImageName.full_name_lower.compute)
+    id_only = ImageName.id_only
+    entry_subtree = ImageName.entry_subtree
+
+
+class CompactAnnotationName(CompactName):
+    """A compact, read-only `AnnotationName`"""
+    __slots__ = ('qualifier', 'noid')
+    _fields = CompactName._fields + __slots__
+    _name_class = AnnotationName
+
+    canonical_name = property(AnnotationName.canonical_name.compute)
+    annotation_name = property(AnnotationName.annotation_name.compute)
+    full_name_upper = property(AnnotationName.full_name_upper.compute)
+    full_name_lower = property(AnnotationName.full_name_lower.compute)
+    entry_subtree = AnnotationName.entry_subtree
+    is_valid = AnnotationName.is_valid
+
+
+ImageName._compact_class = CompactImageName
+AnnotationName._compact_class = CompactAnnotationName
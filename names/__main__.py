@@ -0,0 +1,138 @@
+"""
+Canonicalise newline-delimited names read from stdin or files
+
+    python -m names [--kind image|annotation] [--attrs canonical_name,entry_subtree,noid,valid] [--format tsv|jsonl]
+        [--jobs N] [FILE ...]
+
+Each output line (a TSV row or a JSON object) has the given name followed by the chosen attributes. Names are read,
+parsed and written in chunks so memory use does not depend on the size of the input; with `--jobs N` chunks are
+parsed by N worker processes and written in input order.
+"""
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import sys
+
+from . import ImageName, AnnotationName
+
+_CLASSES = {
+    'image': ImageName,
+    'annotation': AnnotationName,
+}
+
+# attributes which are not plain attributes of names
+_VALID = 'valid'
+
+# the attributes which may be output for each kind of name
+_ATTRS = {
+    'image': ImageName._derived_attrs + (
+        'archive', 'prefix', 'entry_id', 'suffix', 'ext', 'is_test', 'entry_subtree', 'entry_key', _VALID,
+    ),
+}
+_ATTRS['annotation'] = _ATTRS['image'] + ('noid', 'qualifier', 'annotation_name')
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(prog='python -m names', description="Canonicalise EMDB/EMPIAR names")
+    parser.add_argument('files', nargs='*', metavar='FILE', help="files of names, one per line [default: stdin]")
+    parser.add_argument('-k', '--kind', choices=list(_CLASSES), default='image', help="kind of name [default: image]")
+    parser.add_argument(
+        '-a', '--attrs', default='canonical_name,entry_subtree,valid',
+        help="comma-separated attributes to output; 'valid' is whether the name matched (and for annotations whether "
+             "the noid is valid) [default: canonical_name,entry_subtree,valid]"
+    )
+    parser.add_argument('-f', '--format', choices=['tsv', 'jsonl'], default='tsv', help="output format [default: tsv]")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="number of worker processes [default: 1]")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="names per chunk [default: 10000]")
+    args = parser.parse_args(args)
+    args.attrs = [attr.strip() for attr in args.attrs.split(',') if attr.strip()]
+    for attr in args.attrs:
+        if attr not in _ATTRS[args.kind]:
+            parser.error(
+                f"invalid attribute '{attr}' for {args.kind} names; should be one of {', '.join(_ATTRS[args.kind])}"
+            )
+    if args.jobs < 1:
+        parser.error(f"invalid number of jobs {args.jobs}")
+    if args.chunk_size < 1:
+        parser.error(f"invalid chunk size {args.chunk_size}")
+    return args
+
+
+def _values(name, attrs):
+    for attr in attrs:
+        if attr == _VALID:
+            yield name.matched and (not isinstance(name, AnnotationName) or name.is_valid())
+        else:
+            yield getattr(name, attr)
+
+
+def _format_tsv(given_name, values):
+    return '\t'.join([given_name] + ['' if value is None else str(value) for value in values])
+
+
+def _format_jsonl(given_name, values, attrs):
+    return json.dumps(dict(zip(['name'] + attrs, [given_name] + list(values))))
+
+
+def process_chunk(lines, kind, attrs, output_format):
+    """Parse a chunk of lines into a block of output text"""
+    cls = _CLASSES[kind]
+    output = list()
+    for line in lines:
+        given_name = line.rstrip('\r\n')
+        if not given_name:
+            continue
+        values = _values(cls(given_name, lazy=True), attrs)
+        if output_format == 'tsv':
+            output.append(_format_tsv(given_name, values))
+        else:
+            output.append(_format_jsonl(given_name, values, attrs))
+    if output:
+        output.append('')
+    return '\n'.join(output)
+
+
+def _read_lines(files):
+    if not files:
+        yield from sys.stdin
+    for fn in files:
+        with open(fn, buffering=1 << 20) as f:
+            yield from f
+
+
+def _chunks(lines, chunk_size):
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def main(args=None):
+    args = parse_args(args)
+    chunks = _chunks(_read_lines(args.files), args.chunk_size)
+    write = sys.stdout.write
+    if args.format == 'tsv':
+        write(_format_tsv('name', args.attrs) + '\n')
+    if args.jobs == 1:
+        for chunk in chunks:
+            write(process_chunk(chunk, args.kind, args.attrs, args.format))
+    else:
+        with multiprocessing.Pool(args.jobs) as pool:
+            # keep a bounded number of chunks in flight so that memory use stays constant
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(process_chunk, (chunk, args.kind, args.attrs, args.format)))
+                if len(pending) >= 2 * args.jobs:
+                    write(pending.popleft().get())
+            while pending:
+                write(pending.popleft().get())
+    sys.stdout.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+A `pandas` accessor for columns of image and annotation names
+
+    import pandas as pd
+    import names.accessor  # registers the `names` accessor
+
+    df = pd.DataFrame({'file': ['emd_1234.map', 'empiar_10087_c2_tomo02.mrc']})
+    df.file.names.canonical_name   # image names by default
+    df.file.names.entry_subtree
+    df.file.names.annotation.noid  # annotation names
+
+The whole column is parsed with one vectorised regular expression extraction (`IMAGE_NAME_CRE` or
+`ANNOTATION_NAME_CRE`) and each derived column is built with column-wise string operations, with no Python object
+per row. Columns of Arrow-backed strings (`string[pyarrow]`) are supported. Derived values are missing (`NaN`) for
+names which do not match.
+
+Requires `pandas`.
+"""
+import pandas
+
+from . import IMAGE_NAME_CRE, ANNOTATION_NAME_CRE, _NOID_CRE
+from . import noids
+
+_PARTS = ['prefix', 'entry_id', 'suffix', 'ext']
+
+
+@pandas.api.extensions.register_series_accessor('names')
+class NamesAccessor:
+    """Attributes of `ImageName` (or `AnnotationName` through `.annotation`) as columns"""
+    _kind = 'image'
+
+    def __init__(self, series):
+        if not pandas.api.types.is_string_dtype(series) and not pandas.api.types.is_object_dtype(series):
+            raise AttributeError("the names accessor needs a column of strings")
+        self._series = series
+        self._parts = None
+
+    @property
+    def image(self):
+        """The column as image names (the default)"""
+        if self._kind == 'image':
+            return self
+        return NamesAccessor(self._series)
+
+    @property
+    def annotation(self):
+        """The column as annotation names"""
+        if self._kind == 'annotation':
+            return self
+        return _AnnotationNamesAccessor(self._series)
+
+    @property
+    def parts(self):
+        """A data frame of the parts of each name: 'is_test', 'prefix', 'entry_id', 'suffix', 'ext', '_ext' (the
+        extension without defaults) and 'archive' (and for annotations 'qualifier' and 'noid')"""
+        if self._parts is None:
+            self._parts = self._parse()
+        return self._parts
+
+    def _constant(self, value, where):
+        """A column of `value` where `where` is true and missing elsewhere"""
+        return pandas.Series(value, index=self._series.index, dtype=self._series.dtype).where(where)
+
+    def _extract(self, cre):
+        """The parts of each name; the extension without defaults is kept as '_ext'"""
+        series = self._series
+        if isinstance(series.dtype, pandas.ArrowDtype):
+            # pyarrow's own extraction takes neither compiled patterns nor unnamed groups; the pandas string dtype
+            # keeps the same Arrow data
+            series = series.astype(pandas.StringDtype('pyarrow'))
+        extracted = series.str.extract(cre)
+        parts = extracted[_PARTS].copy()
+        matched = parts['prefix'].notna()
+        # the first group is the (unnamed) 'test-' prefix
+        parts.insert(0, 'is_test', extracted[0].notna() & matched)
+        parts['_ext'] = parts['ext']
+        return parts, matched, parts['prefix'].str.lower()
+
+    def _parse(self):
+        parts, matched, lower_prefix = self._extract(IMAGE_NAME_CRE)
+        is_empiar = lower_prefix.isin(['empiar', 'emp'])
+        parts['archive'] = self._constant('emdb', matched).mask(is_empiar, 'empiar')
+        parts['ext'] = parts['ext'].fillna(self._constant('map', matched).mask(is_empiar, 'mrc'))
+        return parts
+
+    @property
+    def matched(self):
+        return self.parts['prefix'].notna()
+
+    @property
+    def is_test(self):
+        return self.parts['is_test']
+
+    @property
+    def archive(self):
+        return self.parts['archive']
+
+    @property
+    def prefix(self):
+        return self.parts['prefix']
+
+    @property
+    def entry_id(self):
+        return self.parts['entry_id']
+
+    @property
+    def suffix(self):
+        return self.parts['suffix']
+
+    @property
+    def ext(self):
+        return self.parts['ext']
+
+    @property
+    def uppercase_hyphen_name(self):
+        return self.prefix.str.upper() + '-' + self.entry_id
+
+    @property
+    def lowercase_hyphen_name(self):
+        return self.prefix.str.lower() + '-' + self.entry_id
+
+    @property
+    def uppercase_underscore_name(self):
+        return self.prefix.str.upper() + '_' + self.entry_id
+
+    @property
+    def lowercase_underscore_name(self):
+        return self.prefix.str.lower() + '_' + self.entry_id
+
+    def _qualified(self):
+        """The part of the suffix which is part of the canonical name (all of it for images)"""
+        return self.suffix
+
+    @property
+    def canonical_name(self):
+        qualified = self.lowercase_underscore_name + self._qualified()
+        return qualified.mask(self.archive.isin(['emdb']), self.lowercase_underscore_name)
+
+    @property
+    def full_name_upper(self):
+        return self.uppercase_hyphen_name + self.suffix.str.upper()
+
+    @property
+    def full_name_lower(self):
+        return self.lowercase_hyphen_name + self.suffix.str.lower()
+
+    @property
+    def file_name(self):
+        # a name which matched ends with its extension exactly when the extension was found in it
+        given = self._series.where(self.matched)
+        return given.where(self.parts['_ext'].notna(), given + '.' + self.ext)
+
+    def _entry_directories(self):
+        entry_id = self.entry_id
+        emdb = entry_id.str[:2] + '/' + entry_id + '/'
+        emdb = emdb.mask(entry_id.str.len().isin([5]), entry_id.str[:2] + '/' + entry_id.str[2] + '/' + entry_id + '/')
+        empiar = self.lowercase_underscore_name + '/' + self.canonical_name + '/'
+        return emdb.mask(self.archive.isin(['empiar']), empiar)
+
+    @property
+    def entry_subtree(self):
+        return self._entry_directories()
+
+
+class _AnnotationNamesAccessor(NamesAccessor):
+    """Attributes of `AnnotationName` as columns"""
+    _kind = 'annotation'
+
+    def _parse(self):
+        parts, matched, lower_prefix = self._extract(ANNOTATION_NAME_CRE)
+        parts['archive'] = self._constant('emdb', matched).mask(lower_prefix.isin(['empiar']), 'empiar')
+        parts['ext'] = parts['ext'].fillna(self._constant('sff', matched))
+        noid_parts = parts['suffix'].str.extract(_NOID_CRE)
+        has_noid = noid_parts['noid'].notna()
+        parts['qualifier'] = noid_parts['qualifier'].where(has_noid, '').where(matched)
+        parts['noid'] = noid_parts['noid'].where(has_noid, '*******').where(matched)  # as in AnnotationName
+        return parts
+
+    @property
+    def qualifier(self):
+        return self.parts['qualifier']
+
+    @property
+    def noid(self):
+        return self.parts['noid']
+
+    def _qualified(self):
+        return self.qualifier
+
+    @property
+    def annotation_name(self):
+        return self.canonical_name + '-' + self.noid
+
+    @property
+    def full_name_upper(self):
+        return self.uppercase_hyphen_name + self.qualifier.str.upper() + '-' + self.noid
+
+    @property
+    def full_name_lower(self):
+        return self.lowercase_hyphen_name + self.qualifier.str.lower() + '-' + self.noid
+
+    @property
+    def entry_subtree(self):
+        return self._entry_directories() + self.noid + '/'
+
+    def is_valid(self):
+        """Whether each noid is valid (missing for names which do not match)
+
+        Each distinct noid is validated once.
+        """
+        has_noid = self.matched & ~self.noid.isin(['*******'])
+        valid = pandas.Series(False, index=self._series.index, dtype='object')
+        valid[has_noid] = noids.validate_many(self.noid[has_noid], memo=dict())
+        return valid.where(self.matched)
@@ -0,0 +1,186 @@
+"""
+A client for the EMDB and EMPIAR REST APIs keyed on `ImageName` objects
+
+    from names import ImageName
+    from names.api import Client
+
+    with Client() as client:
+        client.fast_axis(ImageName('EMD-1832'))  # 'X'
+        client.many(client.density_histogram, [ImageName('EMD-1832'), ImageName('EMD-1833')])  # concurrently
+
+Requests share pooled HTTP sessions (one per thread) and `many()` runs them in a thread pool. Responses are cached
+for `ttl` seconds (or the `max-age` given by the server); stale responses are revalidated with their `ETag` so
+unchanged entries are not downloaded again.
+"""
+import concurrent.futures
+import re
+import threading
+import time
+
+import requests
+import requests.adapters
+
+EMDB_API = "https://www.ebi.ac.uk/pdbe/api/emdb/entry/"
+EMPIAR_API = "https://www.ebi.ac.uk/empiar/api/entry/"
+
+_MAX_AGE_CRE = re.compile(r'max-age=(\d+)')
+
+
+class ResponseCache:
+    """A bounded, thread-safe in-memory cache of responses
+
+    Each item is a tuple `(etag, expires, data)` where `expires` is a time (as from `time.time()`) after which the
+    response must be revalidated.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = dict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, etag, expires, data):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = etag, expires, data
+            while len(self._data) > self.maxsize:
+                del self._data[next(iter(self._data))]  # the oldest
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Client:
+    """A client for the EMDB and EMPIAR REST APIs
+
+    :param str emdb_url: the base URL of the EMDB entry API
+    :param str empiar_url: the base URL of the EMPIAR entry API
+    :param int max_workers: threads used by `many()` (and the size of each session's connection pool)
+    :param float ttl: seconds a response is used without revalidation unless the server gives a `max-age`
+    :param float timeout: seconds to wait for the server
+    :param bool verify: whether to verify TLS certificates
+    :param cache: where responses are cached [default: a `ResponseCache`]; anything with the same `get()` and
+        `set()` methods will do
+    """
+
+    def __init__(self, emdb_url=EMDB_API, empiar_url=EMPIAR_API, max_workers=8, ttl=3600, timeout=30, verify=True,
+                 cache=None):
+        self.emdb_url = emdb_url
+        self.empiar_url = empiar_url
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.timeout = timeout
+        self.verify = verify
+        self.cache = ResponseCache() if cache is None else cache
+        self._local = threading.local()
+        self._sessions = list()
+        self._sessions_lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def session(self):
+        """The HTTP session for the current thread"""
+        try:
+            return self._local.session
+        except AttributeError:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.verify = self.verify
+            with self._sessions_lock:
+                self._sessions.append(session)
+            self._local.session = session
+            return session
+
+    def get_json(self, url):
+        """Get the JSON document at `url` from the cache or the server
+
+        :raise requests.HTTPError: if the server responds with an error
+        """
+        cached = self.cache.get(url)
+        if cached is not None:
+            etag, expires, data = cached
+            if time.time() < expires:
+                return data
+            headers = {'If-None-Match': etag} if etag else {}
+        else:
+            headers = {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached is not None:
+            self.cache.set(url, etag, self._expires(response), data)
+            return data
+        response.raise_for_status()
+        data = response.json()
+        self.cache.set(url, response.headers.get('ETag'), self._expires(response), data)
+        return data
+
+    def _expires(self, response):
+        ttl = self.ttl
+        match = _MAX_AGE_CRE.search(response.headers.get('Cache-Control', ''))
+        if match:
+            ttl = int(match.group(1))
+        return time.time() + ttl
+
+    def emdb_entry(self, image_name):
+        """The EMDB entry (the first record of the `all/` endpoint) for an EMDB image"""
+        accession = image_name.uppercase_hyphen_name
+        return self.get_json(f"{self.emdb_url}all/{accession}")[accession][0]
+
+    def axis_order(self, image_name):
+        """The axis order of an EMDB map e.g. {'fast': 'X', 'medium': 'Y', 'slow': 'Z'}"""
+        return self.emdb_entry(image_name)["map"]["axis_order"]
+
+    def fast_axis(self, image_name):
+        """The fast axis of an EMDB map e.g. 'X'"""
+        return self.axis_order(image_name)["fast"]
+
+    def density_histogram(self, image_name):
+        """The density histogram of an EMDB map: a dictionary with keys 'x' and 'y'"""
+        accession = image_name.uppercase_hyphen_name
+        data = self.get_json(f"{self.emdb_url}analysis/{accession}")
+        return data[accession][0]["density_distribution"]
+
+    def empiar_entry(self, image_name):
+        """The EMPIAR entry (the `all/` endpoint) for an EMPIAR image"""
+        accession = image_name.uppercase_hyphen_name
+        return self.get_json(f"{self.empiar_url}all/{accession}")[accession]
+
+    def imagesets(self, image_name):
+        """The imagesets of an EMPIAR entry"""
+        return self.empiar_entry(image_name)['imagesets']
+
+    def many(self, func, image_names):
+        """Call `func` (e.g. `client.fast_axis`) for each image name concurrently
+
+        :return list: the results in the same order as `image_names`; the first exception raised is re-raised
+        """
+        if self._executor is None:
+            with self._sessions_lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(self.max_workers)
+        return list(self._executor.map(func, image_names))
+
+    def close(self):
+        """Stop the threads and close all sessions"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
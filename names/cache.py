@@ -0,0 +1,77 @@
+import collections
+import threading
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """A bounded, thread-safe least-recently-used cache
+
+    Values are created by calling `factory(key)` on a miss; once the cache holds `maxsize` items the least recently
+    used item is evicted. A `maxsize` of 0 disables caching.
+    """
+
+    def __init__(self, maxsize=4096):
+        if maxsize < 0:
+            raise ValueError(f"invalid maxsize {maxsize}; should be zero or more")
+        self._maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, factory):
+        """Get the value for `key` creating it with `factory(key)` if it is not cached"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return value
+        # create outside the lock; if another thread got there first we return the value it cached
+        value = factory(key)
+        with self._lock:
+            if key in self._data:
+                return self._data[key]
+            if self._maxsize:
+                self._data[key] = value
+                self._evict()
+        return value
+
+    def _evict(self):
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def resize(self, maxsize):
+        """Change the maximum number of cached items evicting the least recently used items as needed"""
+        if maxsize < 0:
+            raise ValueError(f"invalid maxsize {maxsize}; should be zero or more")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Remove all items and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self):
+        """Statistics for the cache as a `CacheInfo` named tuple"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
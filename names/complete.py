@@ -0,0 +1,91 @@
+"""
+An in-memory prefix index of image names for autocomplete (e.g. the Volume Browser search box)
+
+    from names.complete import PrefixIndex
+
+    index = PrefixIndex(image_names)  # ImageName/CompactImageName objects or strings
+    [name.canonical_name for name in index.complete('EMD-18', k=10)]
+    # ['emd_1800', 'emd_18000', ...]
+
+Each name is indexed under its `canonical_name`, `uppercase_hyphen_name` and `full_name_lower`. Keys and queries
+are normalised (lowercase, '_' read as '-') so 'empiar_1031', 'EMPIAR-1031' and 'Empiar-1031' are the same query.
+The keys are kept in one sorted list: a query is a binary search for the first key with the prefix followed by a
+walk along the keys until `k` distinct names are found. Names are kept as `CompactImageName`s (the parts of the name
+in slots, derived names computed on access) so that an index of a whole catalogue stays small.
+"""
+import bisect
+
+from . import ImageName, CompactImageName
+
+# the attributes each name is indexed under
+KEYS = ('canonical_name', 'uppercase_hyphen_name', 'full_name_lower')
+
+
+def normalise(text):
+    """The form of keys and queries: lowercase with '_' read as '-'"""
+    return text.strip().lower().replace('_', '-')
+
+
+class PrefixIndex:
+    """A prefix index over `image_names`
+
+    Names which do not match are ignored; names with the same `canonical_name` are indexed once (the first is kept).
+    Names are stored (and returned by `complete()`) as `CompactImageName`s.
+
+    :param image_names: an iterable of `ImageName` or `CompactImageName` objects or strings
+    """
+
+    def __init__(self, image_names=()):
+        self._names = list()
+        seen = set()
+        pairs = set()
+        for image_name in image_names:
+            if isinstance(image_name, str):
+                image_name = ImageName(image_name, lazy=True)
+            if not image_name.matched or image_name.canonical_name in seen:
+                continue
+            seen.add(image_name.canonical_name)
+            position = len(self._names)
+            if isinstance(image_name, CompactImageName):
+                self._names.append(image_name)
+            else:
+                self._names.append(CompactImageName.from_name(image_name))
+            for attr in KEYS:
+                pairs.add((normalise(getattr(image_name, attr)), position))
+        pairs = sorted(pairs)
+        self._keys = [key for key, _ in pairs]
+        self._positions = [position for _, position in pairs]
+
+    def complete(self, prefix, k=10):
+        """The first `k` names (in key order) with a key starting with `prefix`
+
+        :param str prefix: what has been typed so far e.g. 'empiar_1031' or 'EMD-18'
+        :param int k: the most names to return
+        :return list: `CompactImageName` objects
+        """
+        prefix = normalise(prefix)
+        keys = self._keys
+        found = dict()
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and len(found) < k and keys[i].startswith(prefix):
+            position = self._positions[i]
+            if position not in found:
+                found[position] = self._names[position]
+            i += 1
+        return list(found.values())
+
+    def count(self, prefix):
+        """The number of keys starting with `prefix` (an upper bound on the number of names)"""
+        prefix = normalise(prefix)
+        start = bisect.bisect_left(self._keys, prefix)
+        # '\U0010ffff' sorts after any character that can follow the prefix
+        return bisect.bisect_left(self._keys, prefix + '\U0010ffff', start) - start
+
+    def __contains__(self, name):
+        """Whether `name` (in any case or separator form) is a key"""
+        key = normalise(name)
+        i = bisect.bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def __len__(self):
+        return len(self._names)
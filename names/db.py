@@ -0,0 +1,185 @@
+"""
+Pooled database connections shared by the OMERO/PostgreSQL lookups
+
+    from names import db, omero
+
+    with db.connection(db_string) as conn:  # a connection from the shared pool for db_string
+        image_ids = omero.get_image_ids(conn, image_names)
+
+Pools are keyed by connection string (DSN) and created on first use. Connections which have been idle for longer
+than `health_check_interval` seconds are checked with `SELECT 1` before they are handed out and replaced if they
+are broken.
+"""
+import contextlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _psycopg2_connect(dsn):
+    import psycopg2
+    return psycopg2.connect(dsn)
+
+
+class ConnectionPool:
+    """A thread-safe pool of between `minconn` and `maxconn` connections to `dsn`
+
+    :param str dsn: the connection string
+    :param int minconn: connections opened when the pool is created
+    :param int maxconn: the most connections open at any time; callers wait (up to `timeout` seconds) for one to be
+        returned when all are in use
+    :param connect: a callable taking the DSN and returning a DB-API connection [default: `psycopg2.connect`]
+    :param float health_check_interval: seconds a connection may be idle before it is checked before use
+    :param float timeout: seconds to wait for a connection before raising `TimeoutError`
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, connect=None, health_check_interval=30.0, timeout=30.0):
+        if not 0 <= minconn <= maxconn or maxconn < 1:
+            raise ValueError(f"invalid pool size ({minconn}, {maxconn}); should be 0 <= minconn <= maxconn >= 1")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._connect = connect or _psycopg2_connect
+        self._condition = threading.Condition()
+        # (connection, time last returned) most recently returned last
+        self._idle = list()
+        self._size = 0
+        self._closed = False
+        for _ in range(minconn):
+            self._idle.append((self._connect(dsn), time.monotonic()))
+            self._size += 1
+
+    def _healthy(self, conn):
+        if getattr(conn, 'closed', False):  # psycopg2 connections know when they are closed
+            return False
+        try:
+            cur = conn.cursor()
+            try:
+                cur.execute('SELECT 1')
+                cur.fetchall()
+            finally:
+                cur.close()
+            conn.rollback()
+        except Exception as e:
+            logger.warning("discarding broken connection: %s", e)
+            return False
+        return True
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self):
+        """Take a connection from the pool (return it with `putconn()`)"""
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ValueError("the pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    conn, last_used = None, None
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise TimeoutError(f"no connection available within {self.timeout}s ({self.maxconn} in use)")
+        try:
+            if conn is not None and time.monotonic() - last_used > self.health_check_interval:
+                if not self._healthy(conn):
+                    self._discard(conn)
+                    conn = None
+            if conn is None:
+                conn = self._connect(self.dsn)
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool; pass `close=True` if it is broken"""
+        with self._condition:
+            if close or self._closed or getattr(conn, 'closed', False):
+                self._discard(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """A connection from the pool which is committed (or rolled back on error) and returned on exit"""
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        else:
+            try:
+                conn.commit()
+            except BaseException:
+                broken = True
+                raise
+        finally:
+            self.putconn(conn, close=broken)
+
+    @property
+    def size(self):
+        """The number of open connections (idle and in use)"""
+        return self._size
+
+    @property
+    def idle(self):
+        """The number of idle connections"""
+        return len(self._idle)
+
+    def close(self):
+        """Close all idle connections; connections in use are closed when they are returned"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+                self._size -= 1
+            self._condition.notify_all()
+
+
+_pools = dict()
+_pools_lock = threading.Lock()
+
+
+def get_pool(dsn, minconn=1, maxconn=10, **kwargs):
+    """The shared pool for `dsn` created (with the given arguments; see `ConnectionPool`) on first use"""
+    with _pools_lock:
+        pool = _pools.get(dsn)
+        if pool is None or pool._closed:
+            pool = _pools[dsn] = ConnectionPool(dsn, minconn=minconn, maxconn=maxconn, **kwargs)
+        return pool
+
+
+def connection(dsn, **kwargs):
+    """A connection from the shared pool for `dsn`; use as a context manager"""
+    return get_pool(dsn, **kwargs).connection()
+
+
+def close_all():
+    """Close all shared pools"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
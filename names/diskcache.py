@@ -0,0 +1,218 @@
+"""
+A persistent, size-bounded cache of responses (entry metadata, histograms) on local disk
+
+    from names.api import Client
+    from names.diskcache import DiskCache
+
+    cache = DiskCache('/var/cache/names', maxbytes=256 << 20)
+    client = Client(cache=cache)  # REST responses survive restarts and are shared by processes on the node
+    cache.load_json('emd-1234', '/nfs/.../histograms/emd-1234.json', ttl=86400)  # JSON files read through the cache
+
+Each item is one file holding a fixed header (magic, expiry time and lengths), the ETag and the data in `marshal`
+format. Items are read through `mmap`. The same `get()`/`set()` interface as `names.api.ResponseCache`.
+
+Any number of processes may share a directory. Writes and removals take an exclusive lock (`fcntl.flock`) on the
+directory and keep the total size of the items in a counter file there, so `maxbytes` holds for all processes
+together. Using an item touches its file so modification times order the items by use across processes. Once the
+total passes `maxbytes` the files are totalled again and the least recently used are removed until the items take at
+most `_LOW_WATER` of `maxbytes`, so eviction (and its sort) is not needed on every write.
+"""
+import collections
+import contextlib
+import fcntl
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+# magic, marshal version, expires, ETag length, data length
+_HEADER = struct.Struct('<4sBdII')
+_MAGIC = b'NMC1'
+_LOCK_FILE = '.lock'
+# the total size of the items (ASCII digits)
+_SIZE_FILE = '.size'
+
+# eviction removes items until they take at most this fraction of `maxbytes` so it is not needed on every `set()`
+_LOW_WATER = 0.9
+
+
+class DiskCache:
+    """A cache of `(etag, expires, data)` items in `directory`
+
+    `data` may be anything `marshal` can write (the dictionaries, lists, strings and numbers of JSON documents).
+
+    :param str directory: where to keep the items; created if it does not exist
+    :param int maxbytes: the most bytes the items (of all processes using `directory`) may take
+    """
+
+    def __init__(self, directory, maxbytes=256 << 20):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.maxbytes = maxbytes
+        # serialises the threads of this process; `flock` serialises processes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_name(key):
+        return hashlib.sha1(key.encode()).hexdigest() + '.bin'
+
+    def _path(self, file_name):
+        return os.path.join(self.directory, file_name)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the lock on the directory and the counter; yields a list `[total bytes]` which is written back"""
+        with self._lock, open(self._path(_LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(self._path(_SIZE_FILE)) as f:
+                    total = [int(f.read())]
+            except (OSError, ValueError):
+                total = [sum(size for _, _, size in self._items())]
+            yield total
+            # written in place under the lock; if it is ever unreadable the items are totalled again
+            with open(self._path(_SIZE_FILE), 'w') as f:
+                f.write(str(max(total[0], 0)))
+
+    def _items(self):
+        """The items in the directory as `(mtime_ns, file_name, size)`, least recently used first"""
+        items = list()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.bin'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    items.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        items.sort()
+        return items
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, version, expires, etag_length, data_length = _HEADER.unpack_from(mm)
+                if magic != _MAGIC or version != marshal.version:
+                    raise ValueError(f"invalid cache file '{path}'")
+                offset = _HEADER.size
+                etag = mm[offset:offset + etag_length].decode() if etag_length else None
+                offset += etag_length
+                data = marshal.loads(mm[offset:offset + data_length])
+        return etag, expires, data
+
+    def get(self, key):
+        """The item `(etag, expires, data)` for `key` or `None`
+
+        Expired items without an ETag cannot be revalidated so they are removed.
+        """
+        file_name = self._file_name(key)
+        path = self._path(file_name)
+        try:
+            etag, expires, data = self._read(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            self._remove(file_name)
+            return None
+        if etag is None and expires <= time.time():
+            self._remove(file_name)
+            return None
+        try:
+            os.utime(path)  # mark it as used for every process
+        except FileNotFoundError:
+            pass
+        return etag, expires, data
+
+    def set(self, key, etag, expires, data):
+        """Write the item for `key` evicting the least recently used items if needed"""
+        etag_bytes = etag.encode() if etag else b''
+        data_bytes = marshal.dumps(data)
+        header = _HEADER.pack(_MAGIC, marshal.version, expires, len(etag_bytes), len(data_bytes))
+        path = self._path(self._file_name(key))
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                f.write(etag_bytes)
+                f.write(data_bytes)
+            with self._locked() as total:
+                try:
+                    total[0] -= os.stat(path).st_size
+                except FileNotFoundError:
+                    pass
+                os.replace(tmp_path, path)
+                total[0] += len(header) + len(etag_bytes) + len(data_bytes)
+                if total[0] > self.maxbytes:
+                    total[0] = self._evict()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _evict(self):
+        """Remove the least recently used items until they fit under the low-water mark (with the lock held)
+
+        :return int: the bytes taken by the remaining items
+        """
+        items = collections.OrderedDict((file_name, size) for _, file_name, size in self._items())
+        total = sum(items.values())
+        while items and total > self.maxbytes * _LOW_WATER:
+            file_name, size = items.popitem(last=False)
+            try:
+                os.unlink(self._path(file_name))
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    def _remove(self, file_name):
+        with self._locked() as total:
+            path = self._path(file_name)
+            try:
+                size = os.stat(path).st_size
+                os.unlink(path)
+            except FileNotFoundError:
+                return
+            total[0] -= size
+
+    def load_json(self, key, path, ttl):
+        """Read the JSON file at `path` through the cache
+
+        :param str key: the key e.g. the canonical accession
+        :param str path: the JSON file e.g. a histogram on NFS
+        :param float ttl: seconds before the file is read again
+        """
+        cached = self.get(key)
+        if cached is not None and time.time() < cached[1]:
+            return cached[2]
+        with open(path) as f:
+            data = json.load(f)
+        self.set(key, None, time.time() + ttl, data)
+        return data
+
+    def clear(self):
+        """Remove all items (including those written by other processes)"""
+        with self._locked() as total:
+            for _, file_name, _ in self._items():
+                try:
+                    os.unlink(self._path(file_name))
+                except FileNotFoundError:
+                    pass
+            total[0] = 0
+
+    @property
+    def size(self):
+        """The bytes taken by the items"""
+        try:
+            with open(self._path(_SIZE_FILE)) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return sum(size for _, _, size in self._items())
+
+    def __len__(self):
+        return len(self._items())
@@ -0,0 +1,109 @@
+"""
+A persistent (SQLite) index from `canonical_name`, `annotation_name` and `noid` to files in an archive tree
+
+    python -m names.index INDEX ROOT     # create or update the index of the tree under ROOT
+
+The index is a `names.scan.Snapshot` of the tree which also keeps the names of the files: an update only stats the
+directories, lists those whose modification time changed and parses the files added to them. Lookups only touch the
+index file (keep it on local disk).
+"""
+import argparse
+import os
+import sys
+
+from . import AnnotationName
+from .scan import Snapshot, parse_file_name, _DIRECTORIES_SCHEMA
+
+_SCHEMA = _DIRECTORIES_SCHEMA + """
+CREATE TABLE IF NOT EXISTS files (
+    directory TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    kind TEXT,
+    canonical_name TEXT,
+    annotation_name TEXT,
+    noid TEXT,
+    PRIMARY KEY (directory, file_name)
+);
+CREATE INDEX IF NOT EXISTS files_canonical_name ON files (canonical_name);
+CREATE INDEX IF NOT EXISTS files_annotation_name ON files (annotation_name);
+CREATE INDEX IF NOT EXISTS files_noid ON files (noid);
+"""
+
+
+def _record(directory, file_name):
+    """The row for a file; files whose names do not parse are kept (so they are not parsed again) without a kind"""
+    name = parse_file_name(file_name)
+    if name is None:
+        return directory, file_name, None, None, None, None
+    if isinstance(name, AnnotationName):
+        return directory, file_name, 'annotation', name.canonical_name, name.annotation_name, name.noid
+    return directory, file_name, 'image', name.canonical_name, None, None
+
+
+class NameIndex(Snapshot):
+    """An index of the files in the archive tree under `root` stored in the SQLite database at `path`
+
+    Files whose names do not parse are not indexed. Paths are returned joined to `root`.
+    """
+    _schema = _SCHEMA
+    _description = 'index'
+
+    def _add_files(self, directory, file_names):
+        records = [_record(directory, file_name) for file_name in file_names]
+        self._conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)", records)
+        return sum(record[2] is not None for record in records)
+
+    def _remove_files(self, directory, file_names):
+        rows = [(directory, file_name) for file_name in file_names]
+        removed = self._conn.executemany(
+            "DELETE FROM files WHERE directory = ? AND file_name = ? AND kind IS NOT NULL", rows
+        ).rowcount
+        self._conn.executemany("DELETE FROM files WHERE directory = ? AND file_name = ?", rows)
+        return removed
+
+    def update(self, jobs=8):
+        """Bring the index up to date with the tree
+
+        Only directories whose modification time changed are listed.
+
+        :return: `(added, removed)` the number of files added to and removed from the index
+        """
+        _, added, removed = self._update(jobs)
+        return added, removed
+
+    def _paths(self, column, value):
+        rows = self._conn.execute(
+            f"SELECT directory, file_name FROM files WHERE {column} = ? ORDER BY directory, file_name", (value,)
+        )
+        return [os.path.join(self.root, directory, file_name) for directory, file_name in rows]
+
+    def by_canonical_name(self, canonical_name):
+        """Paths of all images and annotations with this canonical name"""
+        return self._paths('canonical_name', canonical_name)
+
+    def by_annotation_name(self, annotation_name):
+        """Paths of all annotations with this annotation name"""
+        return self._paths('annotation_name', annotation_name)
+
+    def by_noid(self, noid):
+        """Paths of all annotations with this noid"""
+        return self._paths('noid', noid)
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM files WHERE kind IS NOT NULL").fetchone()[0]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m names.index', description="Create or update a name index")
+    parser.add_argument('index', help="the index (SQLite database) file")
+    parser.add_argument('root', help="the root of the archive tree")
+    parser.add_argument('-j', '--jobs', type=int, default=8, help="threads listing directories [default: 8]")
+    args = parser.parse_args(args)
+    with NameIndex(args.index, args.root) as index:
+        added, removed = index.update(jobs=args.jobs)
+        print(f"info: added {added} and removed {removed} files; {len(index)} files indexed", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
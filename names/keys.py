@@ -0,0 +1,105 @@
+"""
+Packed integer keys for entries: sort, bucket and range-filter names without comparing strings
+
+    from names import ImageName, keys
+
+    ImageName('emd_15123.map').entry_key   # one int for archive, entry id and test flag
+    keys.sort(image_names)                 # by archive then entry id
+    list(keys.select(image_names, 'emdb', 15000, 15999))
+    table = keys.key_array(image_names)    # an `array.array` of keys
+
+A key packs (from the most significant bit)
+
+    archive (1 bit: 0 EMDB, 1 EMPIAR) | entry id (17 bits) | 5-digit id (1 bit) | test (1 bit)
+
+so keys sort by archive then numeric entry id, every key fits in 20 bits and all the keys of a range of entries
+form one interval. The qualifier, suffix and extension are not part of the key: all images of an entry share it.
+"""
+import array
+import bisect
+
+_ARCHIVES = ('emdb', 'empiar')
+_ID_SHIFT = 2
+_ID_MASK = (1 << 17) - 1
+_ARCHIVE_SHIFT = 19
+
+# the key of names which do not match in a `key_array()`; sorts after every key
+UNMATCHED = 1 << 20
+
+# unsigned integers of at least 4 bytes
+_TYPECODE = 'I' if array.array('I').itemsize >= 4 else 'L'
+
+
+def pack(archive, entry_id, is_test=False):
+    """The key for an entry
+
+    :param str archive: 'emdb' or 'empiar'
+    :param str entry_id: the entry id as in the name e.g. '1234' or '10087'
+    :param bool is_test: whether the name has the 'test-' prefix
+    """
+    return (
+        _ARCHIVES.index(archive) << _ARCHIVE_SHIFT
+        | int(entry_id) << _ID_SHIFT
+        | (len(entry_id) == 5) << 1
+        | bool(is_test)
+    )
+
+
+def unpack(key):
+    """The archive, entry id (as in the name) and test flag of a key"""
+    entry_id = (key >> _ID_SHIFT) & _ID_MASK
+    width = 5 if key & 2 else 4
+    return _ARCHIVES[key >> _ARCHIVE_SHIFT], f"{entry_id:0{width}d}", bool(key & 1)
+
+
+def key_range(archive, first, last):
+    """The keys `(low, high)` (low <= key < high) of the entries `first` to `last` (inclusive) of an archive"""
+    base = _ARCHIVES.index(archive) << _ARCHIVE_SHIFT
+    return base | int(first) << _ID_SHIFT, base | (int(last) + 1) << _ID_SHIFT
+
+
+def _key(name):
+    key = name.entry_key
+    return UNMATCHED if key is None else key
+
+
+def key_array(names):
+    """The keys of `names` as an `array.array` (`UNMATCHED` for names which do not match)"""
+    return array.array(_TYPECODE, map(_key, names))
+
+
+def sort(names):
+    """A list of `names` sorted by key; names which do not match come last"""
+    return sorted(names, key=_key)
+
+
+def bucket(names, size=1000):
+    """Group `names` into buckets of `size` consecutive entry ids
+
+    :return dict: `(archive, first entry id of the bucket)` -> list of names; names which do not match are left out
+    """
+    buckets = dict()
+    for name in names:
+        key = name.entry_key
+        if key is None:
+            continue
+        entry_id = (key >> _ID_SHIFT) & _ID_MASK
+        buckets.setdefault((_ARCHIVES[key >> _ARCHIVE_SHIFT], entry_id - entry_id % size), list()).append(name)
+    return buckets
+
+
+def select(names, archive, first, last):
+    """The names of the entries `first` to `last` (inclusive) of an archive, in the order given"""
+    low, high = key_range(archive, first, last)
+    for name in names:
+        key = name.entry_key
+        if key is not None and low <= key < high:
+            yield name
+
+
+def search(sorted_keys, archive, first, last):
+    """The positions `(start, stop)` in `sorted_keys` (e.g. a sorted `key_array()`) of the entries `first` to `last`
+    (inclusive) of an archive"""
+    low, high = key_range(archive, first, last)
+    start = bisect.bisect_left(sorted_keys, low)
+    return start, bisect.bisect_left(sorted_keys, high, start)
@@ -0,0 +1,156 @@
+"""
+In-process metrics for the names parsed by `ImageName` and `AnnotationName` (including cached and compact names)
+
+    from names import metrics
+
+    metrics.enable(latency=True)
+    ...
+    metrics.snapshot()       # a dictionary of counters and histograms
+    metrics.to_prometheus()  # the same in the Prometheus text exposition format
+    metrics.disable()
+
+Metrics are disabled by default; when disabled parsing does no extra work.
+"""
+import bisect
+import collections
+import threading
+
+from . import noids
+
+# upper bounds (in seconds) of the parse latency histogram buckets
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3)
+
+
+class Metrics:
+    """Counters of matches (by kind and archive), failures (by kind) and invalid noids (by archive) and optional
+    parse latency histograms (by kind)"""
+
+    def __init__(self, latency=False, buckets=DEFAULT_BUCKETS):
+        self.latency = latency
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._matches = collections.Counter()
+            self._failures = collections.Counter()
+            self._invalid_noids = collections.Counter()
+            # kind -> [count per bucket (the last is +Inf), total count, total seconds]
+            self._latency = dict()
+
+    def record(self, name, elapsed):
+        """Record a parsed name which took `elapsed` seconds to parse"""
+        kind = name._kind
+        with self._lock:
+            if name.archive is None:
+                self._failures[kind] += 1
+            else:
+                self._matches[kind, name.archive] += 1
+                _noid = getattr(name, 'noid', None)
+                if _noid is not None and (_noid == '*******' or not noids.validate(_noid)):
+                    self._invalid_noids[name.archive] += 1
+            if self.latency:
+                try:
+                    histogram = self._latency[kind]
+                except KeyError:
+                    histogram = self._latency[kind] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+                histogram[0][bisect.bisect_left(self.buckets, elapsed)] += 1
+                histogram[1] += 1
+                histogram[2] += elapsed
+
+    def snapshot(self):
+        """The current values
+
+        :return dict: with keys 'matches' (kind -> archive -> count), 'failures' (kind -> count), 'invalid_noids'
+            (archive -> count) and 'latency' (kind -> {'buckets': {upper bound: cumulative count}, 'count', 'sum'})
+        """
+        with self._lock:
+            matches = dict()
+            for (kind, archive), count in sorted(self._matches.items()):
+                matches.setdefault(kind, dict())[archive] = count
+            latency = dict()
+            for kind, (counts, count, total) in sorted(self._latency.items()):
+                cumulative = 0
+                buckets = dict()
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    buckets[bound] = cumulative
+                latency[kind] = {'buckets': buckets, 'count': count, 'sum': total}
+            return {
+                'matches': matches,
+                'failures': dict(sorted(self._failures.items())),
+                'invalid_noids': dict(sorted(self._invalid_noids.items())),
+                'latency': latency,
+            }
+
+    def to_prometheus(self):
+        """The current values in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP names_matches_total Names which matched.',
+            '# TYPE names_matches_total counter',
+        ]
+        for kind, archives in snapshot['matches'].items():
+            for archive, count in archives.items():
+                lines.append(f'names_matches_total{{kind="{kind}",archive="{archive}"}} {count}')
+        lines += [
+            '# HELP names_failures_total Names which did not match.',
+            '# TYPE names_failures_total counter',
+        ]
+        for kind, count in snapshot['failures'].items():
+            lines.append(f'names_failures_total{{kind="{kind}"}} {count}')
+        lines += [
+            '# HELP names_invalid_noids_total Annotation names which matched but whose noid is invalid.',
+            '# TYPE names_invalid_noids_total counter',
+        ]
+        for archive, count in snapshot['invalid_noids'].items():
+            lines.append(f'names_invalid_noids_total{{archive="{archive}"}} {count}')
+        if snapshot['latency']:
+            lines += [
+                '# HELP names_parse_seconds Time to parse a name.',
+                '# TYPE names_parse_seconds histogram',
+            ]
+            for kind, histogram in snapshot['latency'].items():
+                for bound, count in histogram['buckets'].items():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'names_parse_seconds_bucket{{kind="{kind}",le="{le}"}} {count}')
+                lines.append(f'names_parse_seconds_sum{{kind="{kind}"}} {histogram["sum"]!r}')
+                lines.append(f'names_parse_seconds_count{{kind="{kind}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def enable(latency=False, buckets=DEFAULT_BUCKETS):
+    """Start collecting metrics (replacing any collected so far)
+
+    :param bool latency: also collect parse latency histograms
+    :param buckets: the upper bounds (in seconds) of the histogram buckets
+    :return: the `Metrics` object
+    """
+    from . import Name
+    Name.metrics = Metrics(latency=latency, buckets=buckets)
+    return Name.metrics
+
+
+def disable():
+    """Stop collecting metrics"""
+    from . import Name
+    Name.metrics = None
+
+
+def current():
+    """The `Metrics` being collected or `None` if metrics are disabled"""
+    from . import Name
+    return Name.metrics
+
+
+def snapshot():
+    """A snapshot of the current metrics (empty if disabled)"""
+    metrics = current()
+    return Metrics().snapshot() if metrics is None else metrics.snapshot()
+
+
+def to_prometheus():
+    """The current metrics in Prometheus text format (empty counters if disabled)"""
+    metrics = current()
+    return Metrics().to_prometheus() if metrics is None else metrics.to_prometheus()
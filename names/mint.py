@@ -0,0 +1,144 @@
+"""
+Mint noids for new annotations in bulk without reissuing any noid already issued
+
+The noids already issued are kept in a registry file (one noid per line) which is loaded into memory once; each
+new noid is checked against it in memory and appended to the registry before the new noids are handed out.
+
+    registry = NoidRegistry('issued_noids.txt')
+    registry.register_names(existing_annotation_file_names)  # once, to seed the registry
+    new_noids = registry.mint(1000)
+
+Any number of processes may mint from the same registry: minting holds an exclusive lock (`fcntl.flock` on
+`<path>.lock`) while it reads the noids appended by other processes since the registry was last read, mints and
+appends the new noids.
+"""
+import contextlib
+import fcntl
+import os
+import random
+
+import noid
+
+from . import AnnotationName
+from . import noids
+
+
+class NoidRegistry:
+    """The set of noids issued so far persisted at `path`
+
+    Pass `seed` for a reproducible sequence of noids (tests only).
+    """
+
+    def __init__(self, path, seed=None):
+        self.path = path
+        self._random = random.Random(seed)
+        self._issued = set()
+        # how much of the registry has been read
+        self._offset = 0
+        # noids registered (or minted with `save=False`) but not yet saved
+        self._unsaved = list()
+        self._refresh()
+
+    def _refresh(self):
+        """Read the noids appended to the registry (by any process) since it was last read"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # a line without its newline is still being written
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        self._issued.update(data[:end].decode().split())
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the lock on the registry which is brought up to date first"""
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh()
+            yield
+
+    def _append(self, _noids):
+        """Append noids to the registry (with the lock held)"""
+        with open(self.path, 'a+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            lines = ''.join(f"{_noid}\n" for _noid in _noids).encode()
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b'\n':  # a line left unfinished by a process which died
+                    lines = b'\n' + lines
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+            self._offset = f.tell()
+
+    def register(self, _noids):
+        """Record noids issued elsewhere (saved by `save()` or the next `mint()`)
+
+        :param _noids: an iterable of noids
+        :return int: the number of noids not previously registered
+        """
+        new_noids = set(_noids) - self._issued
+        self._issued.update(new_noids)
+        self._unsaved.extend(new_noids)
+        return len(new_noids)
+
+    def register_names(self, names):
+        """Record the noids of existing annotations
+
+        :param names: an iterable of annotation names (strings or `AnnotationName` objects); names which do not match
+            or whose noids are invalid are ignored
+        :return int: the number of noids not previously registered
+        """
+        _noids = list()
+        for name in names:
+            if not isinstance(name, AnnotationName):
+                name = AnnotationName(name, lazy=True)
+            if name.matched and noids.validate(name.noid):
+                _noids.append(name.noid)
+        return self.register(_noids)
+
+    def mint(self, count, save=True):
+        """Mint `count` new noids which have not been issued before
+
+        The noids are the same as those from `noid.mint(template='zeeeeeek')`: six random extended digits and a
+        check digit.
+
+        :param int count: the number of noids
+        :param bool save: whether to append the new noids to the registry (under the lock) before returning; without
+            saving the noids are only unique among those this registry has read
+        :return list: the new noids
+        """
+        with self._locked() if save else contextlib.nullcontext():
+            issued = self._issued
+            alphabet = noid.utils.XDIGIT
+            choices = self._random.choices
+            check_digit = noids.check_digit
+            new_noids = list()
+            while len(new_noids) < count:
+                body = ''.join(choices(alphabet, k=6))
+                _noid = body + check_digit(body)
+                if _noid in issued:
+                    continue
+                issued.add(_noid)
+                new_noids.append(_noid)
+            if save:
+                self._append(self._unsaved + new_noids)
+                self._unsaved.clear()
+            else:
+                self._unsaved.extend(new_noids)
+        return new_noids
+
+    def save(self):
+        """Append the noids registered or minted without saving to the registry"""
+        with self._locked():
+            self._append(self._unsaved)
+            self._unsaved.clear()
+
+    def __contains__(self, _noid):
+        return _noid in self._issued
+
+    def __len__(self):
+        return len(self._issued)
@@ -0,0 +1,89 @@
+"""
+Fast validation of noids (nice opaque IDs) consistent with `noid.validate`
+
+The check digit is the sum of the position-weighted indices of the characters in the extended digit alphabet
+(`noid.utils.XDIGIT`) modulo its size. Instead of looking up each character in the alphabet we use one precomputed
+table per position mapping a character to its weighted index. Anything the tables do not cover (characters outside
+the alphabet, scheme strings such as 'ark:/', very long ids) is passed to `noid.validate` so that the result is
+always the same.
+"""
+_MAX_LENGTH = 32
+# the `noid` package and the tables are loaded on first use so that importing `names` stays cheap
+noid = None
+_XDIGIT = None
+_BASE = None
+# _WEIGHTS[i][c] is the weighted index of character c at position i
+_WEIGHTS = None
+
+
+def _load():
+    global noid, _XDIGIT, _BASE, _WEIGHTS
+    import noid as noid_package
+    alphabet = ''.join(noid_package.utils.XDIGIT)
+    noid, _XDIGIT, _BASE = noid_package, alphabet, len(alphabet)
+    _WEIGHTS = tuple(
+        {c: index * (position + 1) for index, c in enumerate(alphabet)} for position in range(_MAX_LENGTH - 1)
+    )
+    return _WEIGHTS
+
+
+def check_digit(body):
+    """The check digit for a noid without its check digit
+
+    The same as `noid.calculate_check_digit` only faster.
+
+    :param str body: the noid without its check digit e.g. 'jsiLm2'
+    :return str: the check digit
+    """
+    tables = _WEIGHTS or _load()
+    if not body or len(body) >= _MAX_LENGTH:
+        return noid.calculate_check_digit(body)
+    try:
+        total = sum([weights[c] for weights, c in zip(tables, body)])
+    except KeyError:
+        return noid.calculate_check_digit(body)
+    return _XDIGIT[total % _BASE]
+
+
+def validate(_noid):
+    """Check whether the last character of the noid is its check digit
+
+    The same as `noid.validate` only faster.
+
+    :param str _noid: the noid e.g. 'jsiLm2m'
+    :return bool: whether the noid is valid
+    """
+    w = _WEIGHTS or _load()
+    if len(_noid) == 7:  # the noids in annotation names
+        try:
+            total = (
+                    w[0][_noid[0]] + w[1][_noid[1]] + w[2][_noid[2]] + w[3][_noid[3]] + w[4][_noid[4]] +
+                    w[5][_noid[5]]
+            )
+        except KeyError:
+            return noid.validate(_noid)
+        return _XDIGIT[total % _BASE] == _noid[6]
+    if not _noid:
+        return noid.validate(_noid)
+    return check_digit(_noid[:-1]) == _noid[-1]
+
+
+def validate_many(noids, memo=None):
+    """Validate many noids
+
+    :param noids: an iterable of noids
+    :param dict memo: an optional dictionary of noid to result which is consulted and updated; pass the same
+        dictionary to later calls when the same noids recur
+    :return list: a list of booleans in the same order as `noids`
+    """
+    if memo is None:
+        return list(map(validate, noids))
+    results = list()
+    append = results.append
+    for _noid in noids:
+        try:
+            append(memo[_noid])
+        except KeyError:
+            memo[_noid] = valid = validate(_noid)
+            append(valid)
+    return results
@@ -0,0 +1,162 @@
+"""
+Look up the OMERO images for Volume Browser (VB) images
+
+Each VB image is held in OMERO as six images (views) named after the image e.g. `emd_1234-top.map`,
+`emd_1234-front-thumb.map`. All the views of many images are resolved with a single parameterised query over any
+DB-API connection (e.g. `psycopg2` for OMERO's PostgreSQL database or `sqlite3` for a local stand-in): the names are
+passed as one array parameter (`name = ANY(%s)`) except for SQLite, which has no arrays and takes them in batches of
+`IN (?, ...)` within its limit on parameters. Take connections from a shared pool with
+`names.db.connection(db_string)`.
+"""
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# view -> the suffix of the OMERO image name
+VIEWS = {
+    'top': 'top',
+    'front': 'front',
+    'side': 'right',
+    'top-thumb': 'top-thumb',
+    'front-thumb': 'front-thumb',
+    'side-thumb': 'right-thumb',
+}
+
+# contrast limits used when the contrast of an image is not known
+DEFAULT_CONTRAST = (0, 65535)
+
+# the most names in a single SQLite query; keeps the number of parameters within SQLite's limit
+_MAX_PARAMETERS = 900
+
+
+def view_names(image_name):
+    """The names of the OMERO images for each view of an image
+
+    :param image_name: an `ImageName`
+    :return dict: view -> OMERO image name e.g. {'top': 'emd_1234-top.map', ...}
+    """
+    return {view: f"{image_name.canonical_name}-{suffix}.{image_name.ext}" for view, suffix in VIEWS.items()}
+
+
+def _is_sqlite(conn):
+    return type(conn).__module__.startswith('sqlite3')
+
+
+def _placeholder(conn):
+    """The parameter placeholder for the connection's driver ('?' for sqlite3, '%s' for psycopg2 etc.)"""
+    if _is_sqlite(conn):
+        return '?'
+    return '%s'
+
+
+def _select_images(cur, conn, omero_names):
+    """The `(id, name)` rows of the images named `omero_names` in order of id within each query"""
+    if not _is_sqlite(conn):
+        # one array parameter however many names
+        cur.execute("SELECT id, name FROM image WHERE name = ANY(%s) ORDER BY id", [omero_names])
+        yield from cur.fetchall()
+        return
+    for start in range(0, len(omero_names), _MAX_PARAMETERS):
+        batch = omero_names[start:start + _MAX_PARAMETERS]
+        cur.execute(f"SELECT id, name FROM image WHERE name IN ({', '.join('?' * len(batch))}) ORDER BY id", batch)
+        yield from cur.fetchall()
+
+
+def get_image_ids(conn, image_names):
+    """Get the OMERO image ids for all views of the given images
+
+    Images are keyed by canonical name and extension: 'emd_1234.map' and 'emd_1234.mrc' are different images. If
+    there is more than one OMERO image with the same name the lowest id is used.
+
+    :param conn: a DB-API connection to the OMERO database
+    :param image_names: an iterable of `ImageName` objects; names which did not match are ignored
+    :return dict: `(canonical name, ext)` -> {view: image id (or `None` if there is no such image)}
+    """
+    image_ids = dict()
+    # OMERO image name -> ((canonical name, ext), view)
+    wanted = dict()
+    for image_name in image_names:
+        if not image_name.matched:
+            continue
+        key = image_name.canonical_name, image_name.ext
+        image_ids[key] = dict.fromkeys(VIEWS)
+        for view, omero_name in view_names(image_name).items():
+            wanted[omero_name] = key, view
+    if not wanted:
+        return image_ids
+    cur = conn.cursor()
+    try:
+        for image_id, omero_name in _select_images(cur, conn, list(wanted)):
+            key, view = wanted[omero_name]
+            if image_ids[key][view] is None:
+                image_ids[key][view] = image_id
+            else:
+                logger.warning("too many images named '%s'; using the first (%s)", omero_name, image_ids[key][view])
+    finally:
+        cur.close()
+    return image_ids
+
+
+def get_image_params(conn, image_name, top_id=None, get_contrast=None):
+    """Get the size and contrast limits of an image
+
+    :param conn: a DB-API connection to the OMERO database
+    :param image_name: an `ImageName`
+    :param top_id: the id of the top view (see `get_image_ids()`)
+    :param get_contrast: an optional callable taking `top_id` and returning `(contrast_min, contrast_max)`; the
+        contrast limits default to `DEFAULT_CONTRAST`
+    :return dict: with keys 'x-size', 'y-size', 'z-size' (`None` if the image is not found), 'contrast_min' and
+        'contrast_max'
+    """
+    image_params = {
+        'x-size': None,
+        'y-size': None,
+        'z-size': None,
+        'contrast_min': None,
+        'contrast_max': None,
+    }
+    if image_name.matched:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT sizex, sizey, sizez FROM pixels WHERE name = {_placeholder(conn)}",
+                [view_names(image_name)['front']]
+            )
+            row = cur.fetchone()
+        finally:
+            cur.close()
+        if row is None:
+            logger.warning("could not find the size of '%s'", image_name)
+        else:
+            image_params['x-size'], image_params['y-size'], image_params['z-size'] = row
+    contrast = None
+    if get_contrast is not None and top_id is not None:
+        try:
+            contrast = get_contrast(top_id)
+        except Exception as e:
+            logger.warning("could not find the contrast of '%s': %s", image_name, e)
+    if contrast is None:
+        contrast = DEFAULT_CONTRAST
+    image_params['contrast_min'], image_params['contrast_max'] = contrast
+    return image_params
+
+
+def get_data_from_db(conn, entry_name):
+    """Get the rows of the `empiar.image` table for the top views of all images of an entry
+
+    Uses a PostgreSQL regular expression match so `conn` must be a PostgreSQL connection.
+
+    :param conn: a `psycopg2` connection to the OMERO database
+    :param entry_name: an `ImageName` for the entry e.g. `ImageName('EMPIAR-10461')`
+    :return list: the rows (an empty list if the name did not match)
+    """
+    if not entry_name.matched:
+        return list()
+    pattern = rf"^{re.escape(entry_name.lowercase_underscore_name)}([-_].*)*-top\.(map|mrc)$"
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT * FROM empiar.image WHERE empiar.image.name ~ %s", [pattern])
+        return cur.fetchall()
+    finally:
+        cur.close()
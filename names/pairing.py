@@ -0,0 +1,81 @@
+"""
+Pair annotations with the images they annotate
+
+    from names.pairing import pair
+
+    pairing = pair(annotation_files, image_files)  # names as strings or `AnnotationName`/`ImageName` objects
+    for annotation, images in pairing.paired:
+        ...
+    pairing.orphans      # annotations with no image
+    pairing.unannotated  # images with no annotation
+
+An annotation annotates the images with the same `canonical_name` (the prefix, entry id and, for EMPIAR, the
+qualifier). Both listings are read once: the images are bucketed by canonical name in a dictionary and each
+annotation is looked up in it so the time taken grows linearly with the number of files.
+"""
+from . import ImageName, AnnotationName
+
+
+class Pairing:
+    """The outcome of pairing annotations with images
+
+    - `paired` is a list of `(annotation, images)` pairs where `images` is a list of the images with the annotation's
+      canonical name (e.g. both 'emd_1234.map' and 'emd_1234.mrc')
+    - `orphans` is a list of annotations with no image
+    - `unannotated` is a list of images with no annotation
+    - `unmatched` is a list of the given names (of either kind) which do not parse
+
+    Lists keep the order of the listings.
+    """
+
+    def __init__(self):
+        self.paired = list()
+        self.orphans = list()
+        self.unannotated = list()
+        self.unmatched = list()
+
+    def __str__(self):
+        return (
+            f"{len(self.paired)} paired annotations, {len(self.orphans)} orphan annotations, "
+            f"{len(self.unannotated)} unannotated images, {len(self.unmatched)} unmatched names"
+        )
+
+
+def _names(cls, names, unmatched):
+    for name in names:
+        if isinstance(name, str):
+            name = cls(name)
+        if name.matched:
+            yield name
+        else:
+            unmatched.append(str(name))
+
+
+def pair(annotations, images):
+    """Pair each annotation with the images it annotates
+
+    :param annotations: an iterable of `AnnotationName` objects or strings
+    :param images: an iterable of `ImageName` objects or strings
+    :return Pairing: the pairs, orphans and unannotated images
+    """
+    pairing = Pairing()
+    # canonical name -> images
+    buckets = dict()
+    image_names = list()
+    for image_name in _names(ImageName, images, pairing.unmatched):
+        image_names.append(image_name)
+        bucket = buckets.get(image_name.canonical_name)
+        if bucket is None:
+            buckets[image_name.canonical_name] = [image_name]
+        else:
+            bucket.append(image_name)
+    annotated = set()
+    for annotation_name in _names(AnnotationName, annotations, pairing.unmatched):
+        bucket = buckets.get(annotation_name.canonical_name)
+        if bucket is None:
+            pairing.orphans.append(annotation_name)
+        else:
+            pairing.paired.append((annotation_name, bucket))
+            annotated.add(annotation_name.canonical_name)
+    pairing.unannotated = [image_name for image_name in image_names if image_name.canonical_name not in annotated]
+    return pairing
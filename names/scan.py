@@ -0,0 +1,437 @@
+"""
+Audit an EMDB/EMPIAR archive tree: check that every file sits in its `entry_subtree`
+
+    python -m names.scan [--kind auto|image|annotation] [--jobs N] [--quiet] ROOT
+    python -m names.scan --snapshot SNAPSHOT ROOT  # only the files added or removed since the last run
+
+Directories are listed with `os.scandir` in a thread pool (listing dominates on network filesystems) and every file
+name is parsed as it arrives. Problems are written as TSV rows of `problem, path, expected directory` where the
+problem is one of 'misplaced', 'unparsable', 'invalid_noid' or 'unreadable'.
+
+With `--snapshot` the directories of the tree are kept in a SQLite file. Each run only stats the known directories,
+lists those which changed and parses the files added or removed since; these are written as TSV rows of `change,
+path, canonical name`.
+"""
+import argparse
+import collections
+import concurrent.futures
+import os
+import sqlite3
+import sys
+import time
+
+from . import ImageName, AnnotationName, classify
+
+_CLASSES = {
+    'image': ImageName,
+    'annotation': AnnotationName,
+}
+
+
+class ScanReport:
+    """The outcome of scanning a tree
+
+    - `misplaced` is a list of `(path, expected_directory)` pairs
+    - `unparsable` is a list of paths of files whose names do not parse
+    - `invalid_noid` is a list of paths of annotations whose noids are not valid
+    - `unreadable` is a list of directories which could not be listed
+
+    All paths are relative to the root of the scan and use '/' as separator.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.directories = 0
+        self.misplaced = list()
+        self.unparsable = list()
+        self.invalid_noid = list()
+        self.unreadable = list()
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def files_per_second(self):
+        if self.elapsed:
+            return self.files / self.elapsed
+        return 0.0
+
+    @property
+    def ok(self):
+        return not (self.misplaced or self.unparsable or self.invalid_noid or self.unreadable)
+
+    def __str__(self):
+        return (
+            f"{self.files} files in {self.directories} directories in {self.elapsed:.1f}s "
+            f"({self.files_per_second:.0f} files/s): {len(self.misplaced)} misplaced, {len(self.unparsable)} "
+            f"unparsable, {len(self.invalid_noid)} invalid noids, {len(self.unreadable)} unreadable directories"
+        )
+
+
+def _join(reldir, name):
+    if reldir:
+        return f"{reldir}/{name}"
+    return name
+
+
+def _list_dir(root, reldir):
+    """List a directory relative to root
+
+    :return: `(reldir, subdirs, files, mtime_ns, error)`
+    """
+    subdirs = list()
+    files = list()
+    path = os.path.join(root, reldir)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(_join(reldir, entry.name))
+                else:
+                    files.append(entry.name)
+    except OSError as e:
+        return reldir, subdirs, files, None, e
+    return reldir, subdirs, files, mtime_ns, None
+
+
+def walk(root, jobs=8):
+    """Walk the tree under root listing directories in a thread pool
+
+    Directories are yielded in no particular order.
+
+    :param str root: the root of the tree
+    :param int jobs: the number of threads listing directories
+    :return: yields `(reldir, files, mtime_ns, error)` where `reldir` is relative to root ('' for root), `mtime_ns`
+        is the modification time of the directory and `error` is an `OSError` if the directory could not be listed
+    """
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        pending = {executor.submit(_list_dir, root, '')}
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                reldir, subdirs, files, mtime_ns, error = future.result()
+                for subdir in subdirs:
+                    pending.add(executor.submit(_list_dir, root, subdir))
+                yield reldir, files, mtime_ns, error
+
+
+def parse_file_name(file_name, kind='auto'):
+    """Parse a file name as an image or annotation
+
+    :param str file_name: the name of the file
+    :param str kind: one of 'image', 'annotation' or 'auto' (use `classify()` to decide)
+    :return: a (lazy) `ImageName` or `AnnotationName` or `None` if the name does not parse
+    """
+    if kind == 'auto':
+        result = classify(file_name)
+        if result is None:
+            return None
+        if file_name.endswith('.'):
+            # image and annotation names disagree on where trailing dots belong; let the class decide
+            return _CLASSES[result.kind](file_name, lazy=True)
+        # the parts found by `classify()` are those the class would find; do not parse the name again
+        return _CLASSES[result.kind].from_tuple((file_name, result[2:7]))
+    name = _CLASSES[kind](file_name, lazy=True)
+    if not name.matched:
+        return None
+    return name
+
+
+def check_file(reldir, file_name, kind='auto'):
+    """Check a single file
+
+    :return: `None` if the file is fine otherwise a tuple `(problem, path, expected_directory)`
+    """
+    path = _join(reldir, file_name)
+    name = parse_file_name(file_name, kind=kind)
+    if name is None:
+        return 'unparsable', path, None
+    expected = name.entry_subtree.rstrip('/')
+    if reldir != expected:
+        return 'misplaced', path, expected
+    if isinstance(name, AnnotationName) and not name.is_valid():
+        return 'invalid_noid', path, expected
+    return None
+
+
+def scan_tree(root, kind='auto', jobs=8, progress=None, interval=1.0):
+    """Scan the tree under root for misplaced, unparsable and invalid files
+
+    :param str root: the root of the tree; `entry_subtree` is taken relative to it
+    :param str kind: one of 'image', 'annotation' or 'auto'
+    :param int jobs: the number of threads listing directories
+    :param progress: an optional callable taking the (partial) `ScanReport` every `interval` seconds
+    :param float interval: seconds between calls to `progress`
+    :return: a `ScanReport`
+    """
+    if kind not in ('auto', *_CLASSES):
+        raise ValueError(f"invalid kind '{kind}'; should be one of auto, {', '.join(_CLASSES)}")
+    report = ScanReport()
+    last_progress = report.started
+    for reldir, files, _, error in walk(root, jobs=jobs):
+        report.directories += 1
+        if error is not None:
+            report.unreadable.append(reldir)
+        for file_name in files:
+            problem = check_file(reldir, file_name, kind=kind)
+            if problem is None:
+                continue
+            problem, path, expected = problem
+            if problem == 'misplaced':
+                report.misplaced.append((path, expected))
+            elif problem == 'unparsable':
+                report.unparsable.append(path)
+            else:
+                report.invalid_noid.append(path)
+        report.files += len(files)
+        if progress is not None:
+            now = time.monotonic()
+            if now - last_progress >= interval:
+                report.elapsed = now - report.started
+                progress(report)
+                last_progress = now
+    report.elapsed = time.monotonic() - report.started
+    return report
+
+
+# a change to a file found by `Snapshot.update()`: `change` is 'added' or 'removed' and `name` is the parsed name (or
+# `None` if the name does not parse)
+Event = collections.namedtuple('Event', ['change', 'path', 'name'])
+
+# the tables of every snapshot; a snapshot adds a `files` table with (at least) `directory` and `file_name` columns
+_DIRECTORIES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS directories (directory TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER);
+"""
+
+_SNAPSHOT_SCHEMA = _DIRECTORIES_SCHEMA + """
+CREATE TABLE IF NOT EXISTS files (
+    directory TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    PRIMARY KEY (directory, file_name)
+);
+"""
+
+# directories modified this close to (or after) the start of the last update may have changed again within the
+# resolution of their modification time (seconds on some filesystems) so they are listed again
+_RACY_NS = 2_000_000_000
+
+
+def _parent(reldir):
+    if not reldir:
+        return None
+    return reldir.rpartition('/')[0]
+
+
+def _revisit(root, reldir, known, trusted_before_ns):
+    """Stat a directory and only list it if it changed since it was last listed
+
+    :param known: `(mtime_ns, subdirs)` from the snapshot or `None` for a new directory
+    :return: `(reldir, subdirs, files, mtime_ns, error, listed)`; `files` is `None` if the directory was not listed
+    """
+    if known is not None and known[0] is not None:
+        try:
+            mtime_ns = os.stat(os.path.join(root, reldir)).st_mtime_ns
+        except OSError as e:
+            return reldir, list(), None, None, e, False
+        if mtime_ns == known[0] and mtime_ns < trusted_before_ns:
+            return reldir, known[1], None, mtime_ns, None, False
+    return (*_list_dir(root, reldir), True)
+
+
+class Snapshot:
+    """A snapshot of the tree under `root` stored in the SQLite database at `path`
+
+    The snapshot records the modification time and the files of every directory. `update()` only lists the
+    directories whose modification time changed (adding or removing a file or subdirectory changes it) and only parses
+    the files added or removed, so the time taken grows with the number of directories (one `stat` each) and the
+    number of changes rather than with the number of files.
+
+    Subclasses (e.g. `names.index.NameIndex`) may keep more about each file: they extend `_schema` (keeping the
+    `directory` and `file_name` columns of `files`) and override `_add_files()` and `_remove_files()`.
+    """
+    _schema = _SNAPSHOT_SCHEMA
+    _description = 'snapshot'
+
+    def __init__(self, path, root=None):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self._schema)
+        stored_root = self._conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        if root is None:
+            if stored_root is None:
+                raise ValueError(f"{self._description} '{path}' is empty; the root of the tree is required")
+            root = stored_root[0]
+        elif stored_root is not None and stored_root[0] != os.path.abspath(root):
+            raise ValueError(f"{self._description} '{path}' is for root '{stored_root[0]}' not '{root}'")
+        self.root = os.path.abspath(root)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('root', ?)", (self.root,))
+
+    def _known(self):
+        """directory -> `(mtime_ns, subdirs)` as at the last update"""
+        known = {
+            directory: (mtime_ns, list())
+            for directory, mtime_ns in self._conn.execute("SELECT directory, mtime_ns FROM directories")
+        }
+        for directory, parent in self._conn.execute("SELECT directory, parent FROM directories"):
+            if parent in known:
+                known[parent][1].append(directory)
+        return known
+
+    def _files(self, directory):
+        return {row[0] for row in self._conn.execute("SELECT file_name FROM files WHERE directory = ?", (directory,))}
+
+    def _add_files(self, directory, file_names):
+        """Record files added to a directory
+
+        :return int: the number of files to count as added
+        """
+        self._conn.executemany(
+            "INSERT INTO files (directory, file_name) VALUES (?, ?)",
+            [(directory, file_name) for file_name in file_names]
+        )
+        return len(file_names)
+
+    def _remove_files(self, directory, file_names):
+        """Forget files removed from a directory
+
+        :return int: the number of files to count as removed
+        """
+        self._conn.executemany(
+            "DELETE FROM files WHERE directory = ? AND file_name = ?",
+            [(directory, file_name) for file_name in file_names]
+        )
+        return len(file_names)
+
+    def _update(self, jobs):
+        """Bring the snapshot up to date with the tree
+
+        :return: `(changes, added, removed)` where `changes` is a list of `(change, reldir, file_name)` and `added`
+            and `removed` are the totals returned by `_add_files()` and `_remove_files()`
+        """
+        conn = self._conn
+        started_ns = time.time_ns()
+        scanned_ns = conn.execute("SELECT value FROM meta WHERE key = 'scanned_ns'").fetchone()
+        trusted_before_ns = int(scanned_ns[0]) - _RACY_NS if scanned_ns else 0
+        known = self._known()
+        seen = set()
+        changes = list()
+        added_count = removed_count = 0
+        with conn, concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+            pending = {executor.submit(_revisit, self.root, '', known.get(''), trusted_before_ns)}
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    reldir, subdirs, files, mtime_ns, error, listed = future.result()
+                    seen.add(reldir)
+                    if error is not None:
+                        if reldir in known:
+                            # list it again next time; meanwhile its subdirectories are still checked
+                            conn.execute("UPDATE directories SET mtime_ns = NULL WHERE directory = ?", (reldir,))
+                            subdirs = known[reldir][1]
+                        else:
+                            seen.discard(reldir)
+                            subdirs = list()
+                    elif listed:
+                        indexed = self._files(reldir) if reldir in known else set()
+                        current = set(files)
+                        added = current - indexed
+                        removed = indexed - current
+                        removed_count += self._remove_files(reldir, removed)
+                        added_count += self._add_files(reldir, added)
+                        conn.execute(
+                            "INSERT OR REPLACE INTO directories VALUES (?, ?, ?)", (reldir, _parent(reldir), mtime_ns)
+                        )
+                        changes.extend(('added', reldir, file_name) for file_name in added)
+                        changes.extend(('removed', reldir, file_name) for file_name in removed)
+                    for subdir in subdirs:
+                        pending.add(executor.submit(_revisit, self.root, subdir, known.get(subdir), trusted_before_ns))
+            for directory in known.keys() - seen:
+                removed = self._files(directory)
+                removed_count += self._remove_files(directory, removed)
+                changes.extend(('removed', directory, file_name) for file_name in removed)
+                conn.execute("DELETE FROM directories WHERE directory = ?", (directory,))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('scanned_ns', ?)", (str(started_ns),))
+        return changes, added_count, removed_count
+
+    def update(self, kind='auto', jobs=8):
+        """Bring the snapshot up to date with the tree
+
+        The first update finds every file as added. Directories which cannot be read keep their files and are listed
+        again by the next update.
+
+        :param str kind: how to parse the files: one of 'image', 'annotation' or 'auto'
+        :param int jobs: the number of threads checking and listing directories
+        :return list: an `Event` for each file added or removed since the last update, sorted by path
+        """
+        if kind not in ('auto', *_CLASSES):
+            raise ValueError(f"invalid kind '{kind}'; should be one of auto, {', '.join(_CLASSES)}")
+        changes, _, _ = self._update(jobs)
+        events = [
+            Event(change, _join(reldir, file_name), parse_file_name(file_name, kind=kind))
+            for change, reldir, file_name in changes
+        ]
+        events.sort(key=lambda event: event.path)
+        return events
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m names.scan', description="Audit an EMDB/EMPIAR archive tree")
+    parser.add_argument('root', help="the root of the archive tree")
+    parser.add_argument(
+        '-k', '--kind', choices=['auto', *_CLASSES], default='auto', help="kind of files [default: auto]"
+    )
+    parser.add_argument('-j', '--jobs', type=int, default=8, help="threads listing directories [default: 8]")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not report progress on stderr")
+    parser.add_argument(
+        '-s', '--snapshot', help="a snapshot (SQLite) file; only report the files added or removed since the last run"
+    )
+    args = parser.parse_args(args)
+
+    if args.snapshot:
+        start = time.monotonic()
+        with Snapshot(args.snapshot, args.root) as snapshot:
+            events = snapshot.update(kind=args.kind, jobs=args.jobs)
+            for event in events:
+                canonical_name = event.name.canonical_name if event.name is not None else ''
+                sys.stdout.write(f"{event.change}\t{event.path}\t{canonical_name}\n")
+            if not args.quiet:
+                print(
+                    f"info: {len(events)} changes in {time.monotonic() - start:.1f}s; {len(snapshot)} files",
+                    file=sys.stderr
+                )
+        return 0
+
+    def _progress(report):
+        print(f"info: {report.files} files ({report.files_per_second:.0f} files/s)...", file=sys.stderr)
+
+    report = scan_tree(args.root, kind=args.kind, jobs=args.jobs, progress=None if args.quiet else _progress)
+    write = sys.stdout.write
+    for path, expected in report.misplaced:
+        write(f"misplaced\t{path}\t{expected}\n")
+    for path in report.unparsable:
+        write(f"unparsable\t{path}\t\n")
+    for path in report.invalid_noid:
+        write(f"invalid_noid\t{path}\t\n")
+    for reldir in report.unreadable:
+        write(f"unreadable\t{reldir}\t\n")
+    if not args.quiet:
+        print(f"info: {report}", file=sys.stderr)
+    return 0 if report.ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,14 +24,58 @@ emdb_django.empiar3d
 * [TO TEST] json_filename = self.get_json_filename(**kwargs)
 """
 
+import contextlib
+import http.server
+import io
+import json
+import os
+import pickle
+import random
 import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 
 import noid
-import psycopg2
-import requests
 
-from . import ImageName, AnnotationName
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+else:
+    from . import api  # the REST client needs requests
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+from . import ImageName, AnnotationName, CompactImageName, CompactAnnotationName, classify, parse_many
+from . import _SCANNERS
+from . import complete
+from . import __main__ as cli
+from . import db
+from . import diskcache
+from . import index
+from . import keys
+from . import metrics
+from . import omero
+from . import pairing
+from . import mint
+from . import noids
+from . import scan
+from .cache import LRUCache
+from ._corpus import EXOTIC_IMAGE_NAMES
 
 _image_attrs = [
     'canonical_name',
@@ -173,157 +217,6 @@ class TestImageName(unittest.TestCase):
         self.assertEqual('EMD-1832.map', en.file_name)
         self.assertEqual('map', en.ext)
 
-    @staticmethod
-    def get_image_ids(db_string, image_name, ext):
-        """
-        Get image IDs from OMERO DB
-        """
-        image_ids = {
-            'top': None, 'front': None, 'side': None,
-            'top-thumb': None, 'front-thumb': None, 'side-thumb': None,
-        }
-
-        with psycopg2.connect(db_string) as conn:
-            try:
-                cur = conn.cursor()
-            except Exception as e:
-                print(str(e))
-                return image_ids
-            else:
-                # top image id
-                try:
-                    _image_name = '{}-top.{}'.format(image_name, ext)
-                    print('top image: {}'.format(_image_name))
-                    cur.execute("""SELECT id from image WHERE image.name = '{}'""".format(_image_name))
-                    rows = cur.fetchall()
-                    if len(rows) > 1:
-                        print(
-                            'Too many ({}) images for top image. Image must be unique. Picking first...'.format(
-                                _image_name))
-                    image_ids['top'] = rows[0][0]
-                except Exception as e:
-                    print(str(e))
-
-                # front image id
-                try:
-                    _image_name = '{}-front.{}'.format(image_name, ext)
-                    cur.execute("""SELECT id from image WHERE image.name = '{}'""".format(_image_name))
-                    rows = cur.fetchall()
-                    if 0 < len(rows) > 1:
-                        print(
-                            'Too many ({}) images for front image. Image must be unique. Picking first...'.format(
-                                _image_name))
-                    image_ids['front'] = rows[0][0]
-                except Exception as e:
-                    print(str(e))
-
-                # side image id
-                try:
-                    _image_name = '{}-right.{}'.format(image_name, ext)
-                    cur.execute("""SELECT id from image WHERE image.name = '{}'""".format(_image_name))
-                    rows = cur.fetchall()
-                    if 0 < len(rows) > 1:
-                        print(
-                            'Too many ({}) images for side image. Image must be unique. Picking first...'.format(
-                                _image_name))
-                    image_ids['side'] = rows[0][0]
-                except Exception as e:
-                    print(str(e))
-
-                # top-thumb image id
-                try:
-                    _image_name = '{}-top-thumb.{}'.format(image_name, ext)
-                    cur.execute("""SELECT id from image WHERE image.name = '{}'""".format(_image_name))
-                    rows = cur.fetchall()
-                    if len(rows) > 1:
-                        print(
-                            'Too many ({}) images for top-thumb image. Image must be unique. Picking first...'.format(
-                                _image_name))
-                    image_ids['top-thumb'] = rows[0][0]
-                except Exception as e:
-                    print(str(e))
-
-                # front-thumb image id
-                try:
-                    _image_name = '{}-front-thumb.{}'.format(image_name, ext)
-                    cur.execute("""SELECT id from image WHERE image.name = '{}'""".format(_image_name))
-                    rows = cur.fetchall()
-                    if 0 < len(rows) > 1:
-                        print(
-                            'Too many ({}) images for front-thumb image. Image must be unique. Picking first...'.format(
-                                _image_name))
-                    image_ids['front-thumb'] = rows[0][0]
-                except Exception as e:
-                    print(str(e))
-
-                # side-thumb image id
-                try:
-                    _image_name = '{}-right-thumb.{}'.format(image_name, ext)
-                    cur.execute("""SELECT id from image WHERE image.name = '{}'""".format(_image_name))
-                    rows = cur.fetchall()
-                    if 0 < len(rows) > 1:
-                        print(
-                            'Too many ({}) images for side-thumb image. Image must be unique. Picking first...'.format(
-                                _image_name))
-                    image_ids['side-thumb'] = rows[0][0]
-                except Exception as e:
-                    print(str(e))
-
-        return image_ids
-
-    @staticmethod
-    def get_image_params(db_string, image_name, ext, top_id):
-        """
-        Get image params depending on entry type
-        """
-        image_params = {
-            'x-size': None,
-            'y-size': None,
-            'z-size': None,
-            'contrast_min': None,
-            'contrast_max': None,
-        }
-
-        with psycopg2.connect(db_string) as conn:
-            try:
-                cur = conn.cursor()
-            except Exception as e:
-                print(str(e))
-                return image_params
-            else:
-                _image_name = '{}-front.{}'.format(image_name, ext)
-                try:
-                    query = """SELECT sizex,sizey,sizez from pixels WHERE name = '{}'""".format(_image_name)
-                    cur.execute(
-                        query)  # + """' AND image.owner_id = 2""")
-                    rows = cur.fetchall()
-                    image_params['x-size'], image_params['y-size'], image_params['z-size'] = rows[0]
-                except Exception:
-                    print('Could not find image sizes')
-                try:
-                    contrast_min, contrast_max = get_fb_channel(top_id)
-                    image_params['contrast_min'], image_params['contrast_max'] = contrast_min, contrast_max
-                except Exception:
-                    print('Could not find image contrast values; using defaults (min, max) = (0, 65535)')
-                    image_params['contrast_min'] = 0
-                    image_params['contrast_max'] = 65535
-
-        return image_params
-
-    @staticmethod
-    def get_data_from_db(db_string, entry_name):
-        data_from_db = list()
-        # fixme: referring to a deprecated attribute
-        if entry_name.matched:
-            # regex rooted on entry name
-            query = f"select * from empiar.image where empiar.image.name ~ '^{entry_name.lowercase_underscore_name}([-_].*)*-top\.(map|mrc)$'"
-            # search the omero postgres db for the image name
-            with psycopg2.connect(db_string) as conn:
-                cur = conn.cursor()
-                cur.execute(query)
-                data_from_db = cur.fetchall()
-        return data_from_db
-
     @staticmethod
     def parse_data(entry_name, data_from_db):
         CANONICAL_NAME_RE = r"^(?P<canonical_entry_name>(empiar|emp|EMP|EMPIAR|emd|emdb|EMD|EMDB)[-_]\d{4,5}.*?)\-top\.(map|mrc)$"
@@ -369,28 +262,24 @@ class TestImageName(unittest.TestCase):
                 print(f"info: no match for entry {self.kwargs.get('entry_name')}", file=sys.stderr)
         return data
 
+    @unittest.skipIf(psycopg2 is None, "requires psycopg2")
     def test_get_image_ids(self):
         """Test that we can correctly get image ids as in VB"""
         db_string = "dbname=empe3dstg user=empiar password=pmestgpwd host=pgsql-hxvm-044.ebi.ac.uk port=5432"
-        # EMDB
-        entry_name = ImageName('EMD-1832')
-        image_ids = self.get_image_ids(db_string, entry_name.lowercase_underscore_name, entry_name.ext)
-        self.assertIsInstance(image_ids['top'], int)
-        self.assertIsInstance(image_ids['front'], int)
-        self.assertIsInstance(image_ids['side'], int)
-        self.assertIsInstance(image_ids['top-thumb'], int)
-        self.assertIsInstance(image_ids['front-thumb'], int)
-        self.assertIsInstance(image_ids['side-thumb'], int)
-        # EMPIAR
-        entry_name = ImageName('empiar_10461-survey_image_binned_4')
-        image_ids = self.get_image_ids(db_string, entry_name.canonical_name, entry_name.ext)
-        self.assertIsInstance(image_ids['top'], int)
-        self.assertIsInstance(image_ids['front'], int)
-        self.assertIsInstance(image_ids['side'], int)
-        self.assertIsInstance(image_ids['top-thumb'], int)
-        self.assertIsInstance(image_ids['front-thumb'], int)
-        self.assertIsInstance(image_ids['side-thumb'], int)
+        emdb_name = ImageName('EMD-1832')
+        empiar_name = ImageName('empiar_10461-survey_image_binned_4')
+        with db.connection(db_string) as conn:
+            image_ids = omero.get_image_ids(conn, [emdb_name, empiar_name])
+        for entry_name in [emdb_name, empiar_name]:
+            key = entry_name.canonical_name, entry_name.ext
+            self.assertIsInstance(image_ids[key]['top'], int)
+            self.assertIsInstance(image_ids[key]['front'], int)
+            self.assertIsInstance(image_ids[key]['side'], int)
+            self.assertIsInstance(image_ids[key]['top-thumb'], int)
+            self.assertIsInstance(image_ids[key]['front-thumb'], int)
+            self.assertIsInstance(image_ids[key]['side-thumb'], int)
 
+    @unittest.skipIf(requests is None, "requires requests")
     def test_emdb_api(self):
         """Test that we can get data from EMDB REST API"""
         # all/ endpoint
@@ -410,6 +299,7 @@ class TestImageName(unittest.TestCase):
         self.assertIsInstance(histogram["x"], list)
         self.assertIsInstance(histogram["y"], list)
 
+    @unittest.skipIf(requests is None, "requires requests")
     def test_empiar_api(self):
         """Test that we can correctly get data from the EMPIAR REST API"""
         empiar_rest_api = "https://www.ebi.ac.uk/empiar/api/entry/"
@@ -421,12 +311,14 @@ class TestImageName(unittest.TestCase):
         self.assertTrue('imagesets' in entry_info)
         self.assertIsInstance(entry_info['imagesets'], list)
 
+    @unittest.skipIf(psycopg2 is None, "requires psycopg2")
     def test_get_image_params(self):
         """Test that the get_image_params for EMPIAR entries"""
         db_string = "dbname=empe3dstg user=empiar password=pmestgpwd host=pgsql-hxvm-044.ebi.ac.uk port=5432"
         entry_name = ImageName('empiar_10461-survey_image_binned_4')
-        image_ids = self.get_image_ids(db_string, entry_name.canonical_name, entry_name.ext)
-        image_params = self.get_image_params(db_string, entry_name.canonical_name, entry_name.ext, image_ids['top'])
+        with db.connection(db_string) as conn:
+            image_ids = omero.get_image_ids(conn, [entry_name])[entry_name.canonical_name, entry_name.ext]
+            image_params = omero.get_image_params(conn, entry_name, image_ids['top'])
         self.assertTrue('x-size' in image_params)
         self.assertTrue('y-size' in image_params)
         self.assertTrue('z-size' in image_params)
@@ -438,11 +330,13 @@ class TestImageName(unittest.TestCase):
         self.assertIsInstance(image_params['contrast_min'], int)
         self.assertIsInstance(image_params['contrast_max'], int)
 
+    @unittest.skipIf(psycopg2 is None, "requires psycopg2")
     def test_get_data_from_db(self):
         """Test for EntryURL view"""
         db_string = "dbname=empe3dstg user=empiar password=pmestgpwd host=pgsql-hxvm-044.ebi.ac.uk port=5432"
         entry_name = ImageName('EMPIAR-10461')
-        data_from_db = self.get_data_from_db(db_string, entry_name)
+        with db.connection(db_string) as conn:
+            data_from_db = omero.get_data_from_db(conn, entry_name)
         self.assertIsInstance(data_from_db, list)
         # at least one result
         self.assertTrue(len(data_from_db) >= 1)
@@ -471,6 +365,7 @@ _annotation_attrs = [
 ]
 
 
+
 class TestAnnotationName(unittest.TestCase):
     def test_emdb_defaults(self):
         """Test that even if we fail to parse the given name we have some values"""
@@ -812,3 +707,1310 @@ class TestAnnotationName(unittest.TestCase):
     def test_fail(self):
         an = AnnotationName('emd1234', verbose=True)
         self.assertIsNone(an.canonical_name)
+
+
+class TestParseMany(unittest.TestCase):
+    def test_image(self):
+        names = ['emd_1234.map', 'emd1234', 'test-EMPIAR_10052-ring_1.mrc.gz', 'emdb-12345']
+        results = list(parse_many(names))
+        self.assertEqual(len(names), len(results))
+        self.assertEqual((False, 'emd', '1234', '', 'map'), results[0])
+        self.assertIsNone(results[1])
+        self.assertEqual((True, 'EMPIAR', '10052', '-ring_1', 'mrc.gz'), results[2])
+        self.assertEqual((False, 'emdb', '12345', '', None), results[3])
+        # consistent with ImageName
+        for name, result in zip(names, results):
+            en = ImageName(name)
+            if result is None:
+                self.assertFalse(en.matched)
+            else:
+                self.assertEqual((en.is_test, en.prefix, en.entry_id, en.suffix), result[:4])
+
+    def test_annotation(self):
+        names = ['emd_1234-oZRVsrr.hff', 'empiar_12345-some.other_value-oZRVsrr', 'emd1234']
+        results = list(parse_many(names, kind='annotation'))
+        self.assertEqual((False, 'emd', '1234', '-oZRVsrr', 'hff'), results[0])
+        self.assertEqual((False, 'empiar', '12345', '-some.other_value-oZRVsrr', None), results[1])
+        self.assertIsNone(results[2])
+
+    def test_lazy(self):
+        """Names are consumed on demand"""
+        results = parse_many(iter(['emd_1234', 'emd_1235']))
+        self.assertEqual('1234', next(results)[2])
+        self.assertEqual('1235', next(results)[2])
+
+    def test_invalid_kind(self):
+        with self.assertRaises(ValueError):
+            parse_many(['emd_1234'], kind='volume')
+
+
+class TestLazyName(unittest.TestCase):
+    def test_image(self):
+        """Lazy names have the same attributes as eager names"""
+        for name in ['emd_1234.map', 'EMD-10052', 'test-empiar_10052-ring_1.mrc.gz', 'emd1234']:
+            en = ImageName(name)
+            lazy_en = ImageName(name, lazy=True)
+            for attr in _image_attrs + ['archive', 'prefix', 'entry_id', 'suffix', 'ext', 'entry_subtree']:
+                self.assertEqual(getattr(en, attr), getattr(lazy_en, attr))
+
+    def test_annotation(self):
+        for name in ['emd_1234-oZRVsrr.hff', 'empiar_12345-some.other_value-oZRVsrr.json', 'emd_1234', 'emd1234']:
+            an = AnnotationName(name)
+            lazy_an = AnnotationName(name, lazy=True)
+            for attr in _annotation_attrs + ['archive', 'qualifier', 'noid', 'ext', 'entry_subtree']:
+                self.assertEqual(getattr(an, attr), getattr(lazy_an, attr))
+
+    def test_computed_on_access(self):
+        en = ImageName('empiar_10052-ring_1', lazy=True)
+        self.assertNotIn('canonical_name', vars(en))
+        self.assertEqual('empiar_10052-ring_1', en.canonical_name)
+        self.assertIn('canonical_name', vars(en))
+        self.assertNotIn('full_name_upper', vars(en))
+        # eager names have everything
+        en = ImageName('empiar_10052-ring_1')
+        for attr in _image_attrs:
+            self.assertIn(attr, vars(en))
+
+
+class TestCompactName(unittest.TestCase):
+    def test_image(self):
+        """Compact names have the same attributes as names"""
+        for name in ['emd_1234.map', 'EMD-10052', 'test-empiar_10052-ring_1.mrc.gz', 'emd1234']:
+            en = ImageName(name)
+            compact_en = CompactImageName(name)
+            for attr in _image_attrs + ['archive', 'prefix', 'entry_id', 'suffix', 'ext', 'entry_subtree', 'matched',
+                                        'is_test']:
+                self.assertEqual(getattr(en, attr), getattr(compact_en, attr))
+            self.assertEqual(compact_en, CompactImageName.from_name(en))
+            self.assertEqual(name, str(compact_en))
+
+    def test_annotation(self):
+        for name in ['emd_1234-oZRVsrr.hff', 'empiar_12345-some.other_value-oZRVsrr.json', 'emd_1234', 'emd1234']:
+            an = AnnotationName(name)
+            compact_an = CompactAnnotationName(name)
+            for attr in _annotation_attrs + ['archive', 'qualifier', 'noid', 'ext', 'entry_subtree', 'matched']:
+                self.assertEqual(getattr(an, attr), getattr(compact_an, attr))
+            if an.matched:
+                self.assertEqual(an.is_valid(), compact_an.is_valid())
+
+    def test_compact(self):
+        """No instance dict, no match object and read-only"""
+        compact_en = CompactImageName('empiar_10052-ring_1')
+        self.assertFalse(hasattr(compact_en, '__dict__'))
+        self.assertFalse(hasattr(compact_en, '_match'))
+        with self.assertRaises(AttributeError):
+            compact_en.entry_id = '10053'
+        with self.assertRaises(AttributeError):
+            del compact_en.entry_id
+        self.assertEqual(hash(compact_en), hash(CompactImageName('empiar_10052-ring_1')))
+        self.assertNotEqual(compact_en, CompactImageName('empiar_10052-ring_2'))
+
+
+class TestCachedName(unittest.TestCase):
+    def setUp(self):
+        ImageName.cache.clear()
+        AnnotationName.cache.clear()
+
+    def test_cached(self):
+        en = ImageName.cached('EMD-1832')
+        self.assertIsInstance(en, CompactImageName)
+        self.assertIs(en, ImageName.cached('EMD-1832'))
+        self.assertEqual('emd_1832', en.canonical_name)
+        with self.assertRaises(AttributeError):
+            en.entry_id = '1833'
+        an = AnnotationName.cached('emd_1234-oZRVsrr.hff')
+        self.assertIsInstance(an, CompactAnnotationName)
+        self.assertEqual('oZRVsrr', an.noid)
+        info = ImageName.cache.info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(1, info.misses)
+        self.assertEqual(1, info.currsize)
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.get('emd_1234', CompactImageName)
+        cache.get('emd_1235', CompactImageName)
+        cache.get('emd_1234', CompactImageName)  # emd_1235 is now the least recently used
+        cache.get('emd_1236', CompactImageName)
+        self.assertIn('emd_1234', cache)
+        self.assertNotIn('emd_1235', cache)
+        self.assertEqual((1, 3, 1, 2, 2), tuple(cache.info()))
+        cache.resize(1)
+        self.assertEqual(['emd_1236'], [key for key in ['emd_1234', 'emd_1236'] if key in cache])
+        self.assertEqual(2, cache.info().evictions)
+        with self.assertRaises(ValueError):
+            cache.resize(-1)
+        cache.clear()
+        self.assertEqual((0, 0, 0, 1, 0), tuple(cache.info()))
+
+    def test_disabled(self):
+        cache = LRUCache(maxsize=0)
+        self.assertIsNot(cache.get('emd_1234', CompactImageName), cache.get('emd_1234', CompactImageName))
+        self.assertEqual(0, len(cache))
+
+
+class TestScanner(unittest.TestCase):
+    @staticmethod
+    def _regex_groups(cre, name):
+        m = cre.match(name)
+        if m is None:
+            return None
+        test, prefix, entry_id, suffix, ext = m.group(1, 'prefix', 'entry_id', 'suffix', 'ext')
+        return test is not None, prefix, entry_id, suffix, ext
+
+    def _assert_same(self, name):
+        for cre, scanner in _SCANNERS.items():
+            self.assertEqual(self._regex_groups(cre, name), scanner.scan(name), f"{name!r} ({cre.pattern})")
+
+    def test_exotic_names(self):
+        """The scanner gives the same parts as the compiled regular expressions"""
+        decorations = [
+            '{}', '{}.mrc', '{}.MAP.gz', '{}.rec.gz.gz', '{}..st', '{}.mapmrc', '{}.gz', '{}.', 'test-{}.map',
+            'TEST-test-{}', '{}-oZRVsrr', '{}-oZRVsrr.sff', '{}-oZRVsrr.json.hdf5', '{}-oZRVsrr.h5', '{}_st',
+        ]
+        for image_name in EXOTIC_IMAGE_NAMES + ['emd_1234', 'EMD-10052', 'emdb_12345', 'emp_123456', 'emd_123']:
+            for decoration in decorations:
+                name = decoration.format(image_name)
+                self._assert_same(name)
+                self._assert_same(name.upper())
+
+    def test_random_names(self):
+        """Random names built from the fragments the expressions care about"""
+        fragments = [
+            'test-', 'emd', 'emdb', 'emp', 'empiar', '-', '_', '1', '23', '4567', '.', 'map', 'mrc', 'rec', 'st',
+            '.gz', 'gz', 'sff', 'hff', 'json', 'xml', 'h5', 'hdf5', 'df5', 'x', 'EMD', 'MAP', '.GZ',
+        ]
+        rng = random.Random(1832)
+        for _ in range(20000):
+            self._assert_same(''.join(rng.choice(fragments) for _ in range(rng.randint(1, 12))))
+            self._assert_same('emd_1234' + ''.join(rng.choice(fragments) for _ in range(rng.randint(0, 8))))
+
+    def test_fallback(self):
+        """Names the scanner does not handle still give the regex parts"""
+        for name in ['emd_١٢٣٤.map', 'emd_1234.map\n', 'emd_1234\nx', 'empiar_10052-ſt']:
+            for cre, scanner in _SCANNERS.items():
+                self.assertEqual(self._regex_groups(cre, name), scanner.parse(name))
+
+
+class TestClassify(unittest.TestCase):
+    def test_image(self):
+        result = classify('emd_1234.map')
+        self.assertEqual(('image', 'emdb', False, 'emd', '1234', '', 'map', None, None), tuple(result))
+        result = classify('test-empiar_10087_c2_tomo02')
+        self.assertEqual(('image', 'empiar', True, 'empiar', '10087', '_c2_tomo02', None, None, None), tuple(result))
+        # only image names may have these prefixes
+        self.assertEqual('image', classify('emdb_1234.sff').kind)
+        self.assertEqual('image', classify('emp_10087-oZRVsrr.sff').kind)
+
+    def test_annotation(self):
+        _noid = noid.mint(template='zeeeeeek')
+        result = classify(f'empiar_10052-ring_1-{_noid}.json')
+        self.assertEqual(
+            ('annotation', 'empiar', False, 'empiar', '10052', f'-ring_1-{_noid}', 'json', '-ring_1', _noid),
+            tuple(result)
+        )
+        # without an extension the noid decides
+        self.assertEqual('annotation', classify(f'EMD-1832-{_noid}').kind)
+        self.assertEqual('image', classify(f'EMD-1832-{_noid[:-1]}*').kind)
+        # an annotation extension is enough
+        result = classify('emd_1234.sff')
+        self.assertEqual('annotation', result.kind)
+        self.assertEqual('*******', result.noid)
+
+    def test_neither(self):
+        self.assertIsNone(classify('emd1234'))
+        self.assertIsNone(classify('readme.txt'))
+
+    def test_consistent(self):
+        """The parts are the same as for the corresponding class"""
+        for image_name in EXOTIC_IMAGE_NAMES:
+            annotation_name = f"{image_name}-{noid.mint(template='zeeeeeek')}.sff"
+            for name, cls, kind in [(image_name, ImageName, 'image'), (annotation_name, AnnotationName, 'annotation'),
+                                    (f'{image_name}.mrc.gz', ImageName, 'image')]:
+                result = classify(name)
+                self.assertEqual(kind, result.kind)
+                parsed = cls(name)
+                self.assertEqual(parsed.archive, result.archive)
+                self.assertEqual(parsed.suffix, result.suffix)
+                self.assertEqual(cls.CRE.match(name).group('ext'), result.ext)
+                if kind == 'annotation':
+                    self.assertEqual(parsed.noid, result.noid)
+                    self.assertEqual(parsed.qualifier, result.qualifier)
+        # annotation extensions only count at the very end of the name: trailing dots and repeated extensions
+        _noid = noid.mint(template='zeeeeeek')
+        for name in ['emd_1234.sff.', f'emd_1234-{_noid}.sff.', 'emd_1234.json.json.', 'EMD-12345sff.json.',
+                     'emd_1234.json.json', f'empiar_10087_c2-{_noid}.hff..', 'emd_1234...', 'emd_1234.sff.map.',
+                     f'emd_1234-{_noid}.', 'emd_1234h5-oZRVsrr1xml.']:
+            for hardened in [False, True]:
+                result = classify(name, hardened=hardened)
+                cls = AnnotationName if result.kind == 'annotation' else ImageName
+                parsed = cls(name)
+                self.assertEqual(parsed.suffix, result.suffix, name)
+                self.assertEqual(cls.CRE.match(name).group('ext'), result.ext, name)
+                if result.kind == 'annotation':
+                    self.assertEqual(parsed.noid, result.noid, name)
+                    self.assertEqual(parsed.qualifier, result.qualifier, name)
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False)
+        self.tmp.write('emd_1234.map\nEMPIAR_10052-ring_1\n\nemd1234\n')
+        self.tmp.close()
+
+    def tearDown(self):
+        os.remove(self.tmp.name)
+
+    def _run(self, *args):
+        with io.StringIO() as f, contextlib.redirect_stdout(f):
+            self.assertEqual(0, cli.main(list(args) + [self.tmp.name]))
+            return f.getvalue()
+
+    def test_tsv(self):
+        output = self._run()
+        self.assertEqual(
+            'name\tcanonical_name\tentry_subtree\tvalid\n'
+            'emd_1234.map\temd_1234\t12/1234/\tTrue\n'
+            'EMPIAR_10052-ring_1\tempiar_10052-ring_1\tempiar_10052/empiar_10052-ring_1/\tTrue\n'
+            'emd1234\t\t\tFalse\n',
+            output
+        )
+
+    def test_jsonl(self):
+        output = self._run('--format', 'jsonl', '--attrs', 'uppercase_hyphen_name')
+        rows = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([
+            {'name': 'emd_1234.map', 'uppercase_hyphen_name': 'EMD-1234'},
+            {'name': 'EMPIAR_10052-ring_1', 'uppercase_hyphen_name': 'EMPIAR-10052'},
+            {'name': 'emd1234', 'uppercase_hyphen_name': None},
+        ], rows)
+
+    def test_jobs(self):
+        """Output is in input order whatever the number of jobs"""
+        self.assertEqual(self._run(), self._run('--jobs', '2', '--chunk-size', '1'))
+
+    def test_invalid_attr(self):
+        for attrs in ['canonical_name,annotation_name', 'to_tuple', '_groups', 'is_valid', 'cached']:
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                cli.parse_args(['--attrs', attrs])
+        self.assertEqual(
+            ['noid', 'entry_key', 'valid'],
+            cli.parse_args(['--kind', 'annotation', '--attrs', 'noid,entry_key,valid']).attrs
+        )
+
+
+class TestScan(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.noid = noid.mint(template='zeeeeeek')
+        bad_noid = self.noid[:-1] + ('1' if self.noid[-1] == '0' else '0')
+        self.files = [
+            '12/1234/emd_1234.map',
+            f'12/1234/{self.noid}/emd_1234-{self.noid}.sff',
+            'empiar_10052/empiar_10052-ring_1/empiar_10052-ring_1.mrc',
+            '10/0/10052/emd_1234.map',  # misplaced
+            'empiar_10052/README.txt',  # unparsable
+            f'12/1234/{bad_noid}/emd_1234-{bad_noid}.sff',  # invalid noid
+        ]
+        for fn in self.files:
+            path = os.path.join(self.root, fn)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_scan_tree(self):
+        progress = list()
+        report = scan.scan_tree(self.root, jobs=2, progress=progress.append, interval=0)
+        self.assertEqual(len(self.files), report.files)
+        self.assertEqual([('10/0/10052/emd_1234.map', '12/1234')], report.misplaced)
+        self.assertEqual(['empiar_10052/README.txt'], report.unparsable)
+        self.assertEqual([self.files[-1]], report.invalid_noid)
+        self.assertEqual([], report.unreadable)
+        self.assertFalse(report.ok)
+        self.assertTrue(len(progress) > 0)
+        self.assertTrue(report.files_per_second > 0)
+
+    def test_kind(self):
+        """Forcing the kind parses every file as that kind"""
+        report = scan.scan_tree(self.root, kind='image')
+        self.assertEqual(['empiar_10052/README.txt'], report.unparsable)
+        self.assertEqual(3, len(report.misplaced))  # annotations are not where images should be
+        with self.assertRaises(ValueError):
+            scan.scan_tree(self.root, kind='volume')
+
+    def test_trailing_dot(self):
+        """a name ending in a dot is an image (annotation extensions must end the name) wherever it is found"""
+        file_name = f'emd_1234-{self.noid}.sff.'
+        name = scan.parse_file_name(file_name)
+        self.assertIsInstance(name, ImageName)
+        self.assertEqual(ImageName(file_name).to_tuple(), name.to_tuple())
+        self.assertEqual(ImageName(file_name).file_name, name.file_name)
+        self.assertIsNone(scan.check_file('12/1234', file_name))
+        self.assertEqual(('misplaced', f'12/1234/{self.noid}/{file_name}', '12/1234'),
+                         scan.check_file(f'12/1234/{self.noid}', file_name))
+
+    def test_parse_file_name(self):
+        """names built from the parts found by `classify()` are the same as parsing them"""
+        for fn in [os.path.basename(fn) for fn in self.files] + EXOTIC_IMAGE_NAMES:
+            name = scan.parse_file_name(fn)
+            if name is None:
+                self.assertIsNone(classify(fn))
+                continue
+            self.assertEqual(type(name)(fn).to_tuple(), name.to_tuple())
+            self.assertEqual(type(name)(fn).entry_subtree, name.entry_subtree)
+
+    def test_main(self):
+        with io.StringIO() as f, contextlib.redirect_stdout(f):
+            self.assertEqual(1, scan.main(['--quiet', self.root]))
+            rows = sorted(f.getvalue().splitlines())
+        self.assertEqual(3, len(rows))
+        self.assertIn('misplaced\t10/0/10052/emd_1234.map\t12/1234', rows)
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.snapshot_dir, 'snapshot.sqlite')
+        for fn in ['12/1234/emd_1234.map', 'empiar_10052/empiar_10052-ring_1/empiar_10052-ring_1.mrc', 'a/b/README.txt']:
+            self._touch(fn)
+        self._age()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(self.snapshot_dir)
+
+    def _touch(self, fn):
+        path = os.path.join(self.root, fn)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'w').close()
+
+    def _age(self):
+        """make every directory an hour old so that it is not listed again unless it changes"""
+        past = time.time() - 3600
+        for directory, _, _ in os.walk(self.root):
+            os.utime(directory, (past, past))
+
+    def _changes(self, snapshot):
+        return [(event.change, event.path) for event in snapshot.update(jobs=2)]
+
+    def test_update(self):
+        with scan.Snapshot(self.path, self.root) as snapshot:
+            events = snapshot.update(jobs=2)
+            self.assertEqual(
+                ['12/1234/emd_1234.map', 'a/b/README.txt', 'empiar_10052/empiar_10052-ring_1/empiar_10052-ring_1.mrc'],
+                [event.path for event in events]
+            )
+            self.assertEqual({'added'}, {event.change for event in events})
+            self.assertEqual(
+                ['emd_1234', None, 'empiar_10052-ring_1'],
+                [event.name and event.name.canonical_name for event in events]
+            )
+            self.assertEqual([], self._changes(snapshot))
+            self._touch('12/1234/emd_1234.mrc')
+            shutil.rmtree(os.path.join(self.root, 'a'))
+            self.assertEqual(
+                [('added', '12/1234/emd_1234.mrc'), ('removed', 'a/b/README.txt')], self._changes(snapshot)
+            )
+            self.assertEqual(3, len(snapshot))
+        # persisted
+        with scan.Snapshot(self.path) as snapshot:
+            self.assertEqual([], self._changes(snapshot))
+            with self.assertRaises(ValueError):
+                scan.Snapshot(self.path, self.snapshot_dir)
+
+    def test_unchanged_directories_not_listed(self):
+        with scan.Snapshot(self.path, self.root) as snapshot:
+            snapshot.update(jobs=2)
+            directory = os.path.join(self.root, '12', '1234')
+            mtime_ns = os.stat(directory).st_mtime_ns
+            self._touch('12/1234/emd_1234.mrc')
+            os.utime(directory, ns=(mtime_ns, mtime_ns))  # hide the change
+            self.assertEqual([], self._changes(snapshot))
+            os.utime(directory)
+            self.assertEqual([('added', '12/1234/emd_1234.mrc')], self._changes(snapshot))
+
+    def test_main(self):
+        with io.StringIO() as f, contextlib.redirect_stdout(f):
+            self.assertEqual(0, scan.main(['--quiet', '--snapshot', self.path, self.root]))
+            self.assertEqual(0, scan.main(['--quiet', '--snapshot', self.path, self.root]))
+            rows = sorted(f.getvalue().splitlines())
+        self.assertEqual(3, len(rows))
+        self.assertIn('added\t12/1234/emd_1234.map\temd_1234', rows)
+        self.assertIn('added\ta/b/README.txt\t', rows)
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.noid = noid.mint(template='zeeeeeek')
+        for fn in [
+            '12/1234/emd_1234.map',
+            f'12/1234/{self.noid}/emd_1234-{self.noid}.sff',
+            'empiar_10052/empiar_10052-ring_1/empiar_10052-ring_1.mrc',
+            'empiar_10052/README.txt',
+        ]:
+            self._touch(fn)
+        self.index_path = os.path.join(tempfile.mkdtemp(), 'names.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(os.path.dirname(self.index_path))
+
+    def _touch(self, fn):
+        path = os.path.join(self.root, fn)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'w').close()
+
+    def test_lookup(self):
+        with index.NameIndex(self.index_path, self.root) as name_index:
+            self.assertEqual((3, 0), name_index.update())
+            self.assertEqual(3, len(name_index))
+            self.assertEqual(
+                {os.path.join(self.root, '12/1234', f'{self.noid}/emd_1234-{self.noid}.sff'),
+                 os.path.join(self.root, '12/1234', 'emd_1234.map')},
+                set(name_index.by_canonical_name('emd_1234'))
+            )
+            self.assertEqual(
+                [os.path.join(self.root, '12/1234', f'{self.noid}/emd_1234-{self.noid}.sff')],
+                name_index.by_annotation_name(f'emd_1234-{self.noid}')
+            )
+            self.assertEqual(name_index.by_annotation_name(f'emd_1234-{self.noid}'), name_index.by_noid(self.noid))
+            self.assertEqual([], name_index.by_canonical_name('emd_1235'))
+        # persisted; the root is remembered
+        with index.NameIndex(self.index_path) as name_index:
+            self.assertEqual(3, len(name_index))
+            self.assertEqual(1, len(name_index.by_canonical_name('empiar_10052-ring_1')))
+
+    def test_incremental(self):
+        with index.NameIndex(self.index_path, self.root) as name_index:
+            name_index.update()
+            self.assertEqual((0, 0), name_index.update())
+            self._touch('12/1235/emd_1235.map')
+            os.remove(os.path.join(self.root, '12/1234/emd_1234.map'))
+            shutil.rmtree(os.path.join(self.root, 'empiar_10052'))
+            self.assertEqual((1, 2), name_index.update())
+            self.assertEqual(1, len(name_index.by_canonical_name('emd_1235')))
+            self.assertEqual(1, len(name_index.by_canonical_name('emd_1234')))
+
+    def test_unchanged_directories_not_listed(self):
+        """a change which leaves the modification time as it was is only found while the directory is recent"""
+        directory = os.path.join(self.root, '12', '1234')
+        with index.NameIndex(self.index_path, self.root) as name_index:
+            name_index.update()
+            mtime_ns = os.stat(directory).st_mtime_ns
+            self._touch('12/1234/emd_1234.mrc')
+            os.utime(directory, ns=(mtime_ns, mtime_ns))
+            self.assertEqual((1, 0), name_index.update())  # listed again: modified just before the last update
+            past_ns = time.time_ns() - 3600 * 10 ** 9
+            os.utime(directory, ns=(past_ns, past_ns))
+            name_index.update()
+            self._touch('12/1234/emd_1234.map.gz')
+            os.utime(directory, ns=(past_ns, past_ns))
+            self.assertEqual((0, 0), name_index.update())  # not listed
+            self.assertEqual(4, len(name_index))
+
+    def test_root(self):
+        with self.assertRaises(ValueError):
+            index.NameIndex(self.index_path)
+        index.NameIndex(self.index_path, self.root).close()
+        with self.assertRaises(ValueError):
+            index.NameIndex(self.index_path, tempfile.gettempdir())
+
+
+class TestNoids(unittest.TestCase):
+    def test_validate(self):
+        """the same as noid.validate for valid, invalid and odd noids"""
+        alphabet = ''.join(noid.utils.XDIGIT) + '_lIOQ'
+        _noids = [noid.mint(template='zeeeeeek', n=random.randint(0, 1 << 30)) for _ in range(500)]
+        _noids += [''.join(random.choices(alphabet, k=random.randint(1, 12))) for _ in range(500)]
+        _noids += ['ark:/1234567', 'doi:abcdefg', '*******']
+        with contextlib.redirect_stderr(io.StringIO()):  # noid complains about invalid characters
+            for _noid in _noids:
+                self.assertEqual(noid.validate(_noid), noids.validate(_noid), _noid)
+
+    def test_validate_many(self):
+        good = noid.mint(template='zeeeeeek', n=1)
+        bad = good[:-1] + ('1' if good[-1] == '0' else '0')
+        self.assertEqual([True, False, True], noids.validate_many([good, bad, good]))
+        memo = dict()
+        self.assertEqual([True, False, True], noids.validate_many([good, bad, good], memo=memo))
+        self.assertEqual({good: True, bad: False}, memo)
+        # the memo is trusted
+        memo[good] = False
+        self.assertEqual([False], noids.validate_many([good], memo=memo))
+
+
+class TestNoidRegistry(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'issued_noids.txt')
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path))
+
+    def test_mint(self):
+        registry = mint.NoidRegistry(self.path, seed=0)
+        new_noids = registry.mint(5000)
+        self.assertEqual(5000, len(set(new_noids)))
+        self.assertTrue(all(map(noid.validate, new_noids)))
+        self.assertTrue(all(re.match(r'^\w{7}$', _noid) for _noid in new_noids))
+        # persisted
+        self.assertEqual(set(new_noids), set(mint.NoidRegistry(self.path)._issued))
+
+    def test_no_reissue(self):
+        registry = mint.NoidRegistry(self.path, seed=0)
+        first = registry.mint(10, save=False)
+        # the same random sequence skips the noids already issued
+        registry = mint.NoidRegistry(self.path, seed=0)
+        registry.register(first)
+        self.assertTrue(set(first).isdisjoint(registry.mint(10)))
+        self.assertEqual(20, len(registry))
+
+    def test_register_names(self):
+        _noid = noid.mint(template='zeeeeeek')
+        bad_noid = _noid[:-1] + ('1' if _noid[-1] == '0' else '0')
+        registry = mint.NoidRegistry(self.path)
+        self.assertEqual(1, registry.register_names([
+            f'emd_1234-{_noid}.sff', AnnotationName(f'emd_1234-{_noid}.hff'), f'emd_1234-{bad_noid}.sff', 'emd_1234.map'
+        ]))
+        self.assertIn(_noid, registry)
+        self.assertNotIn(bad_noid, registry)
+        registry.save()
+        self.assertIn(_noid, mint.NoidRegistry(self.path))
+
+    def test_concurrent(self):
+        """registries (in other processes) minting from the same file never issue the same noid"""
+        first = mint.NoidRegistry(self.path, seed=0)
+        second = mint.NoidRegistry(self.path, seed=0)  # the same random sequence
+        self.assertTrue(set(first.mint(10)).isdisjoint(second.mint(10)))
+        minted = list()
+
+        def _mint():
+            registry = mint.NoidRegistry(self.path, seed=1)
+            for _ in range(20):
+                minted.extend(registry.mint(10))
+
+        threads = [threading.Thread(target=_mint) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(800, len(set(minted)))
+        self.assertEqual(820, len(mint.NoidRegistry(self.path)))
+
+    def test_append(self):
+        """new noids are appended and the registry keeps its mode"""
+        registry = mint.NoidRegistry(self.path, seed=0)
+        first = registry.mint(3)
+        os.chmod(self.path, 0o644)
+        with open(self.path, 'a') as f:
+            f.write('abc')  # unfinished by a process which died
+        second = registry.mint(2)
+        with open(self.path) as f:
+            self.assertEqual(first + ['abc'] + second, f.read().split())
+        self.assertEqual(0o644, os.stat(self.path).st_mode & 0o777)
+
+
+class TestMetrics(unittest.TestCase):
+    def tearDown(self):
+        metrics.disable()
+
+    def test_disabled(self):
+        self.assertIsNone(metrics.current())
+        ImageName('emd_1234.map')
+        self.assertEqual({'matches': {}, 'failures': {}, 'invalid_noids': {}, 'latency': {}}, metrics.snapshot())
+
+    def test_counters(self):
+        _noid = noid.mint(template='zeeeeeek')
+        bad_noid = _noid[:-1] + ('1' if _noid[-1] == '0' else '0')
+        metrics.enable()
+        ImageName('emd_1234.map')
+        ImageName('empiar_10087_c2_tomo02.mrc', lazy=True)
+        ImageName('readme.txt')
+        AnnotationName(f'emd_1234-{_noid}.sff')
+        AnnotationName(f'emd_1234-{bad_noid}.sff')
+        CompactAnnotationName(f'empiar_10087_c2_tomo02-{_noid}.sff')
+        self.assertEqual(
+            {
+                'matches': {'annotation': {'emdb': 2, 'empiar': 1}, 'image': {'emdb': 1, 'empiar': 1}},
+                'failures': {'image': 1},
+                'invalid_noids': {'emdb': 1},
+                'latency': {},
+            },
+            metrics.snapshot()
+        )
+        text = metrics.to_prometheus()
+        self.assertIn('names_matches_total{kind="annotation",archive="emdb"} 2\n', text)
+        self.assertIn('names_failures_total{kind="image"} 1\n', text)
+        self.assertIn('names_invalid_noids_total{archive="emdb"} 1\n', text)
+        self.assertNotIn('names_parse_seconds', text)
+        metrics.current().reset()
+        self.assertEqual({}, metrics.snapshot()['matches'])
+
+    def test_latency(self):
+        metrics.enable(latency=True, buckets=(1e-9, 60))
+        for _ in range(10):
+            ImageName('emd_1234.map')
+        histogram = metrics.snapshot()['latency']['image']
+        self.assertEqual({1e-9: 0, 60: 10, float('inf'): 10}, histogram['buckets'])
+        self.assertEqual(10, histogram['count'])
+        self.assertGreater(histogram['sum'], 0)
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE names_parse_seconds histogram\n', text)
+        self.assertIn('names_parse_seconds_bucket{kind="image",le="+Inf"} 10\n', text)
+        self.assertIn('names_parse_seconds_count{kind="image"} 10\n', text)
+
+    def test_verbose_logging(self):
+        with self.assertLogs('names', level='INFO') as logs:
+            ImageName('emd_1234.map', verbose=True)
+            AnnotationName('emd1234', verbose=True)
+        self.assertEqual(2, len(logs.records))
+        self.assertEqual('INFO', logs.records[0].levelname)
+        self.assertIn("matched 'emd_1234.map'", logs.output[0])
+        self.assertEqual('ERROR', logs.records[1].levelname)
+
+
+class _RecordingConnection:
+    """A stand-in for a `psycopg2` connection which records queries and returns `rows` for each"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = list()
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        self.queries.append((query, params))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class TestOmero(unittest.TestCase):
+    """`get_image_ids` against an SQLite stand-in for the OMERO database"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE image (id INTEGER PRIMARY KEY, name TEXT)")
+        self.names = [ImageName('EMD-1832'), ImageName('empiar_10461-survey_image_binned_4')]
+        rows = list()
+        for image_name in self.names:
+            rows += omero.view_names(image_name).values()
+        rows.append('emd_1832-front.map')  # a duplicate
+        rows.append('emd_1833-top.map')  # not wanted
+        self.conn.executemany("INSERT INTO image (name) VALUES (?)", [(row,) for row in rows])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_view_names(self):
+        self.assertEqual(
+            {
+                'top': 'emd_1832-top.map', 'front': 'emd_1832-front.map', 'side': 'emd_1832-right.map',
+                'top-thumb': 'emd_1832-top-thumb.map', 'front-thumb': 'emd_1832-front-thumb.map',
+                'side-thumb': 'emd_1832-right-thumb.map',
+            },
+            omero.view_names(ImageName('EMD-1832'))
+        )
+
+    def test_get_image_ids(self):
+        with self.assertLogs('names.omero', level='WARNING'):
+            image_ids = omero.get_image_ids(self.conn, self.names + [ImageName('emd_1834'), ImageName('readme')])
+        self.assertEqual(
+            {
+                ('emd_1832', 'map'): {
+                    'top': 1, 'front': 2, 'side': 3, 'top-thumb': 4, 'front-thumb': 5, 'side-thumb': 6
+                },
+                ('empiar_10461-survey_image_binned_4', 'mrc'): {
+                    'top': 7, 'front': 8, 'side': 9, 'top-thumb': 10, 'front-thumb': 11, 'side-thumb': 12
+                },
+                ('emd_1834', 'map'): dict.fromkeys(omero.VIEWS),
+            },
+            image_ids
+        )
+
+    def test_extensions(self):
+        """images of the same entry with different extensions are kept apart"""
+        self.conn.execute("INSERT INTO image (name) VALUES ('emd_1832-top.mrc')")
+        image_ids = omero.get_image_ids(self.conn, [ImageName('emd_1832.map'), ImageName('emd_1832.mrc')])
+        self.assertEqual(1, image_ids['emd_1832', 'map']['top'])
+        self.assertEqual(15, image_ids['emd_1832', 'mrc']['top'])
+        self.assertIsNone(image_ids['emd_1832', 'mrc']['front'])
+
+    def test_array_parameter(self):
+        """drivers other than sqlite3 get all the names as one array parameter"""
+        conn = _RecordingConnection([(1, 'emd_1832-top.map')])
+        image_ids = omero.get_image_ids(conn, [ImageName(f'emd_{entry_id}') for entry_id in range(1000, 2000)])
+        self.assertEqual(1, len(conn.queries))
+        query, params = conn.queries[0]
+        self.assertIn('name = ANY(%s)', query)
+        self.assertEqual(6000, len(params[0]))
+        self.assertEqual(1, image_ids['emd_1832', 'map']['top'])
+
+    def test_get_image_params(self):
+        self.conn.execute("CREATE TABLE pixels (name TEXT, sizex INTEGER, sizey INTEGER, sizez INTEGER)")
+        self.conn.execute("INSERT INTO pixels VALUES ('emd_1832-front.map', 100, 200, 300)")
+        self.assertEqual(
+            {'x-size': 100, 'y-size': 200, 'z-size': 300, 'contrast_min': 0, 'contrast_max': 65535},
+            omero.get_image_params(self.conn, self.names[0], 1)
+        )
+        image_params = omero.get_image_params(self.conn, self.names[0], 1, get_contrast=lambda top_id: (top_id, 255))
+        self.assertEqual((1, 255), (image_params['contrast_min'], image_params['contrast_max']))
+        with self.assertLogs('names.omero', level='WARNING'):
+            image_params = omero.get_image_params(self.conn, self.names[1])
+        self.assertIsNone(image_params['x-size'])
+
+    def test_batches(self):
+        """more names than fit into one query"""
+        image_names = [ImageName(f'emd_{entry_id}') for entry_id in range(10000, 10400)]
+        image_names.append(self.names[0])
+        image_ids = omero.get_image_ids(self.conn, image_names)
+        self.assertEqual(401, len(image_ids))
+        self.assertEqual(1, image_ids['emd_1832', 'map']['top'])
+        self.assertEqual({}, omero.get_image_ids(self.conn, []))
+
+
+class TestConnectionPool(unittest.TestCase):
+    """`db.ConnectionPool` over SQLite connections"""
+
+    def setUp(self):
+        self.path = tempfile.mktemp(suffix='.sqlite')
+        self.connects = 0
+
+    def tearDown(self):
+        db.close_all()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _connect(self, dsn):
+        self.connects += 1
+        return sqlite3.connect(dsn, check_same_thread=False)
+
+    def test_reuse(self):
+        pool = db.ConnectionPool(self.path, minconn=1, maxconn=2, connect=self._connect)
+        self.assertEqual((1, 1), (pool.size, pool.idle))
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1)")
+        for _ in range(10):
+            with pool.connection() as conn:
+                self.assertEqual([(1,)], conn.execute("SELECT x FROM t").fetchall())
+        self.assertEqual(1, self.connects)
+        # rolled back on error
+        with self.assertRaises(RuntimeError):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO t VALUES (2)")
+                raise RuntimeError
+        with pool.connection() as conn:
+            self.assertEqual([(1,)], conn.execute("SELECT x FROM t").fetchall())
+        pool.close()
+        self.assertEqual(0, pool.size)
+        with self.assertRaises(ValueError):
+            pool.getconn()
+
+    def test_maxconn(self):
+        pool = db.ConnectionPool(self.path, minconn=0, maxconn=2, connect=self._connect, timeout=0.05)
+        first, second = pool.getconn(), pool.getconn()
+        with self.assertRaises(TimeoutError):
+            pool.getconn()
+        pool.putconn(first)
+        self.assertIs(first, pool.getconn())
+        pool.putconn(second, close=True)
+        self.assertEqual(1, pool.size)
+        with self.assertRaises(ValueError):
+            db.ConnectionPool(self.path, minconn=3, maxconn=2)
+
+    def test_health_check(self):
+        pool = db.ConnectionPool(self.path, minconn=1, maxconn=1, connect=self._connect, health_check_interval=0)
+        conn = pool.getconn()
+        conn.close()  # broken behind the pool's back
+        pool.putconn(conn)
+        with self.assertLogs('names.db', level='WARNING'):
+            with pool.connection() as conn:
+                self.assertEqual([(1,)], conn.execute("SELECT 1").fetchall())
+        self.assertEqual(2, self.connects)
+        self.assertEqual(1, pool.size)
+
+    def test_shared(self):
+        pool = db.get_pool(self.path, connect=self._connect)
+        self.assertIs(pool, db.get_pool(self.path))
+        with db.connection(self.path) as conn:
+            self.assertEqual({}, omero.get_image_ids(conn, []))
+        db.close_all()
+        self.assertIsNot(pool, db.get_pool(self.path, connect=self._connect))
+
+
+class _StubAPIHandler(http.server.BaseHTTPRequestHandler):
+    """Serves `documents` (path -> JSON-serialisable object) with ETags"""
+    documents = dict()
+    requests = list()
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.path not in self.documents:
+            self.send_error(404)
+            return
+        body = json.dumps(self.documents[self.path]).encode()
+        etag = f'"{hash(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(requests is None, "requires requests")
+class TestClient(unittest.TestCase):
+    """`api.Client` against a local stub of the REST APIs"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _StubAPIHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _StubAPIHandler.requests = list()
+        _StubAPIHandler.documents = {
+            f'/emdb/all/EMD-{entry_id}': {
+                f'EMD-{entry_id}': [{'map': {'axis_order': {'fast': 'X', 'medium': 'Y', 'slow': 'Z'}}}]
+            } for entry_id in range(1830, 1840)
+        }
+        _StubAPIHandler.documents['/emdb/analysis/EMD-1832'] = {
+            'EMD-1832': [{'density_distribution': {'x': [0, 1], 'y': [5, 7]}}]
+        }
+        _StubAPIHandler.documents['/empiar/all/EMPIAR-10461'] = {'EMPIAR-10461': {'imagesets': [{'name': 'survey'}]}}
+        self.client = api.Client(emdb_url=self.url + 'emdb/', empiar_url=self.url + 'empiar/', max_workers=4)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_endpoints(self):
+        self.assertEqual('X', self.client.fast_axis(ImageName('EMD-1832')))
+        self.assertEqual({'x': [0, 1], 'y': [5, 7]}, self.client.density_histogram(ImageName('emd_1832.map')))
+        self.assertEqual(
+            [{'name': 'survey'}], self.client.imagesets(ImageName('empiar_10461-survey_image_binned_4'))
+        )
+        with self.assertRaises(requests.HTTPError):
+            self.client.fast_axis(ImageName('EMD-1234'))
+
+    def test_qualified_name(self):
+        """the analysis of a qualified name is that of its entry"""
+        histogram = self.client.density_histogram(ImageName('emd_1832_half1.map'))
+        self.assertEqual({'x': [0, 1], 'y': [5, 7]}, histogram)
+        self.assertEqual(['/emdb/analysis/EMD-1832'], [path for path, _ in _StubAPIHandler.requests])
+
+    def test_cache(self):
+        image_name = ImageName('EMD-1832')
+        self.client.fast_axis(image_name)
+        self.client.axis_order(image_name)
+        self.assertEqual(1, len(_StubAPIHandler.requests))
+        # stale: revalidated with the ETag and not downloaded again
+        self.client.ttl = 0
+        self.client.cache.clear()
+        self.client.fast_axis(image_name)
+        self.client.fast_axis(image_name)
+        (first_path, first_etag), (second_path, second_etag) = _StubAPIHandler.requests[-2:]
+        self.assertEqual('/emdb/all/EMD-1832', second_path)
+        self.assertIsNone(first_etag)
+        self.assertIsNotNone(second_etag)
+        # a changed document is downloaded again
+        _StubAPIHandler.documents['/emdb/all/EMD-1832']['EMD-1832'][0]['map']['axis_order']['fast'] = 'Z'
+        self.assertEqual('Z', self.client.fast_axis(image_name))
+
+    def test_disk_cache(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        image_name = ImageName('EMD-1832')
+        with api.Client(emdb_url=self.url + 'emdb/', cache=diskcache.DiskCache(directory)) as client:
+            self.assertEqual('X', client.fast_axis(image_name))
+        # a new client (or process) on the same node
+        with api.Client(emdb_url=self.url + 'emdb/', cache=diskcache.DiskCache(directory)) as client:
+            self.assertEqual('X', client.fast_axis(image_name))
+        self.assertEqual(1, len(_StubAPIHandler.requests))
+
+    def test_many(self):
+        image_names = [ImageName(f'EMD-{entry_id}') for entry_id in range(1830, 1840)]
+        self.assertEqual(['X'] * 10, self.client.many(self.client.fast_axis, image_names))
+        self.assertEqual(10, len(_StubAPIHandler.requests))
+        self.assertEqual(['X'] * 10, self.client.many(self.client.fast_axis, image_names))
+        self.assertEqual(10, len(_StubAPIHandler.requests))
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_set(self):
+        cache = diskcache.DiskCache(self.directory)
+        self.assertIsNone(cache.get('emd-1234'))
+        data = {'EMD-1234': [{'density_distribution': {'x': [0.5, 1.5], 'y': [3, 4]}}]}
+        expires = time.time() + 60
+        cache.set('emd-1234', '"abc"', expires, data)
+        self.assertEqual(('"abc"', expires, data), cache.get('emd-1234'))
+        # persisted
+        cache = diskcache.DiskCache(self.directory)
+        self.assertEqual(1, len(cache))
+        self.assertEqual(('"abc"', expires, data), cache.get('emd-1234'))
+        # replaced
+        cache.set('emd-1234', None, expires, [])
+        self.assertEqual((None, expires, []), cache.get('emd-1234'))
+        self.assertEqual(1, len(cache))
+        cache.clear()
+        self.assertEqual((0, 0), (len(cache), cache.size))
+
+    def test_expired(self):
+        cache = diskcache.DiskCache(self.directory)
+        cache.set('with-etag', '"abc"', time.time() - 1, 1)
+        cache.set('without-etag', None, time.time() - 1, 2)
+        # expired items with an ETag are kept for revalidation
+        self.assertEqual(1, cache.get('with-etag')[2])
+        self.assertIsNone(cache.get('without-etag'))
+        self.assertEqual(1, len(cache))
+
+    def test_eviction(self):
+        cache = diskcache.DiskCache(self.directory, maxbytes=10_000)
+        for i in range(20):
+            cache.set(f'emd-{i}', None, time.time() + 60, 'x' * 900)
+            cache.get('emd-0')  # keep emd-0 in use
+        self.assertLessEqual(cache.size, 10_000)
+        self.assertLess(len(cache), 20)
+        self.assertIsNotNone(cache.get('emd-0'))
+        self.assertIsNotNone(cache.get('emd-19'))
+        self.assertIsNone(cache.get('emd-1'))
+        self.assertEqual(len(cache), len([fn for fn in os.listdir(self.directory) if fn.endswith('.bin')]))
+
+    def test_shared(self):
+        """the size limit holds across caches (processes) sharing a directory"""
+        first = diskcache.DiskCache(self.directory, maxbytes=10_000)
+        second = diskcache.DiskCache(self.directory, maxbytes=10_000)
+        for i in range(8):
+            first.set(f'first-{i}', None, time.time() + 60, 'x' * 900)
+        for i in range(8):
+            second.set(f'second-{i}', None, time.time() + 60, 'x' * 900)
+        on_disk = sum(
+            os.path.getsize(os.path.join(self.directory, fn)) for fn in os.listdir(self.directory) if fn.endswith('.bin')
+        )
+        self.assertLessEqual(on_disk, 10_000)
+        self.assertEqual(on_disk, first.size)
+        self.assertIsNone(second.get('first-0'))  # the oldest of either cache went first
+        self.assertIsNotNone(second.get('second-7'))
+
+    def test_corrupt(self):
+        cache = diskcache.DiskCache(self.directory)
+        cache.set('emd-1234', None, time.time() + 60, 1)
+        file_name, = [fn for fn in os.listdir(self.directory) if fn.endswith('.bin')]
+        with open(os.path.join(self.directory, file_name), 'wb') as f:
+            f.write(b'junk')
+        self.assertIsNone(cache.get('emd-1234'))
+        self.assertEqual(0, len(cache))
+
+    def test_load_json(self):
+        cache = diskcache.DiskCache(self.directory)
+        path = os.path.join(self.directory, 'emd-1234.json')
+        with open(path, 'w') as f:
+            json.dump({'x': [1], 'y': [2]}, f)
+        self.assertEqual({'x': [1], 'y': [2]}, cache.load_json('emd-1234', path, ttl=60))
+        os.remove(path)
+        self.assertEqual({'x': [1], 'y': [2]}, cache.load_json('emd-1234', path, ttl=60))
+        with self.assertRaises(FileNotFoundError):
+            cache.load_json('emd-1235', path, ttl=60)
+
+
+class TestImport(unittest.TestCase):
+    def _modules(self, code):
+        """The on-demand modules imported by running `code` in a fresh interpreter"""
+        code = f"{code}; import sys; print(','.join(m for m in ['noid', 'requests', 'psycopg2', 'logging'] " \
+               f"if m in sys.modules))"
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        return set(filter(None, result.stdout.strip().split(',')))
+
+    def test_import(self):
+        """importing names only imports what parsing needs"""
+        self.assertEqual(set(), self._modules("import names; names.ImageName('emd_1234.map')"))
+
+    def test_noid_on_demand(self):
+        self.assertEqual(
+            {'noid'}, self._modules("import names; names.AnnotationName('emd_1234-oZRVsrr.sff').is_valid()")
+        )
+
+
+class TestPickle(unittest.TestCase):
+    def _assert_same(self, name, other):
+        self.assertIs(type(name), type(other))
+        attrs = _annotation_attrs + ['qualifier', 'noid'] if isinstance(name, AnnotationName) else _image_attrs
+        for attr in attrs + ['archive', 'prefix', 'entry_id', 'suffix', 'ext', 'is_test', 'matched', 'entry_subtree']:
+            self.assertEqual(getattr(name, attr), getattr(other, attr), attr)
+
+    def test_round_trip(self):
+        _noid = noid.mint(template='zeeeeeek')
+        for image_name in EXOTIC_IMAGE_NAMES + ['emd_1234.map', 'test-EMD-10052.map.gz', 'readme.txt']:
+            for name in [ImageName(image_name), AnnotationName(f"{image_name}-{_noid}.hff")]:
+                self._assert_same(name, pickle.loads(pickle.dumps(name)))
+                self._assert_same(name, type(name).from_tuple(name.to_tuple()))
+                lazy_name = type(name)(str(name), lazy=True)
+                self._assert_same(name, pickle.loads(pickle.dumps(lazy_name)))
+
+    def test_no_parse(self):
+        """unpickling does not parse"""
+        data = pickle.dumps([ImageName('emd_1234.map'), AnnotationName('emd_1234-oZRVsrr.sff')])
+        metrics.enable()
+        self.addCleanup(metrics.disable)
+        names = pickle.loads(data)
+        self.assertEqual(['emd_1234', 'emd_1234'], [name.canonical_name for name in names])
+        self.assertEqual({}, metrics.snapshot()['matches'])
+
+    def test_compact(self):
+        for name in [CompactImageName('empiar_10087_c2_tomo02.mrc'), CompactAnnotationName('emd_1234-oZRVsrr.sff')]:
+            other = pickle.loads(pickle.dumps(name))
+            self.assertEqual(name, other)
+            self.assertEqual(name.entry_subtree, other.entry_subtree)
+            self.assertEqual(name, type(name).from_tuple(name.to_tuple()))
+
+
+@unittest.skipIf(pandas is None, "requires pandas")
+class TestAccessor(unittest.TestCase):
+    """the `names` accessor gives the same values as the classes"""
+
+    @classmethod
+    def setUpClass(cls):
+        from . import accessor  # noqa: F401 registers the accessor
+        _noid = noid.mint(template='zeeeeeek')
+        cls.image_names = EXOTIC_IMAGE_NAMES + [
+            'emd_1234.map', 'EMD-10052', 'test-emd_8750.map.gz', 'emp_10087.rec', 'empiar_10087_c2_tomo02.MRC',
+            'emdb-1234.st', 'emd_12.map', 'readme.txt', '',
+        ]
+        cls.annotation_names = [f"{name}-{_noid}.hff" for name in EXOTIC_IMAGE_NAMES] + [
+            f'emd_1234-{_noid}.sff', f'test-EMD_12345-{_noid}', f'emd_1234-{_noid[:-1]}*.json', 'emd_1234.sff',
+            'empiar_10087_c2_tomo02', 'readme.txt',
+        ]
+
+    @staticmethod
+    def _dtypes():
+        try:
+            import pyarrow
+        except ImportError:
+            return ['object', 'string']
+        return ['object', 'string', pandas.ArrowDtype(pyarrow.string())]
+
+    def _assert_same(self, cls, names, accessor, attrs):
+        for attr in attrs:
+            values = getattr(accessor, attr)
+            if callable(values):
+                values = values()
+            expected = list()
+            for name in names:
+                name = cls(name)
+                if not name.matched and attr not in ('matched', 'is_test'):
+                    expected.append(None)  # missing rather than e.g. the class' default ext
+                    continue
+                value = getattr(name, attr)
+                expected.append(value() if callable(value) else value)
+            self.assertEqual(expected, [None if pandas.isna(value) else value for value in values], attr)
+
+    def test_image(self):
+        for dtype in self._dtypes():
+            series = pandas.Series(self.image_names, dtype=dtype)
+            self._assert_same(
+                ImageName, self.image_names, series.names,
+                _image_attrs + ['matched', 'is_test', 'archive', 'prefix', 'entry_id', 'suffix', 'ext', 'entry_subtree']
+            )
+            pandas.testing.assert_series_equal(series.names.canonical_name, series.names.image.canonical_name)
+
+    def test_annotation(self):
+        for dtype in self._dtypes():
+            series = pandas.Series(self.annotation_names, dtype=dtype)
+            with contextlib.redirect_stderr(io.StringIO()):  # noid complains about invalid characters
+                self._assert_same(
+                    AnnotationName, self.annotation_names, series.names.annotation,
+                    _annotation_attrs + [
+                        'matched', 'archive', 'prefix', 'entry_id', 'suffix', 'ext', 'qualifier', 'noid',
+                        'entry_subtree',
+                    ]
+                )
+            matched = series.names.annotation.matched
+            self.assertEqual(
+                [AnnotationName(name).is_valid() for name in series[matched] if AnnotationName(name).noid != '*******'],
+                [valid for valid, name in zip(series.names.annotation.is_valid()[matched], series[matched])
+                 if AnnotationName(name).noid != '*******']
+            )
+
+    def test_not_strings(self):
+        with self.assertRaises(AttributeError):
+            pandas.Series([1, 2]).names
+
+
+class TestPrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = complete.PrefixIndex([
+            'emd_1832.map', 'EMD-1833', 'emd_18000.map', 'emd_2000', 'empiar_10310_c2_tomo02.mrc',
+            'EMPIAR-10310_aligned', 'empiar_10311', 'readme.txt', ImageName('emd_1832.mrc'),
+        ])
+
+    def _canonical_names(self, prefix, k=10):
+        return [name.canonical_name for name in self.index.complete(prefix, k=k)]
+
+    def test_len(self):
+        """names which do not match and repeated canonical names are not indexed"""
+        self.assertEqual(7, len(self.index))
+
+    def test_case_and_separators(self):
+        for prefix in ['emd_18', 'EMD-18', 'Emd-18', ' emd_18']:
+            self.assertEqual(['emd_18000', 'emd_1832', 'emd_1833'], self._canonical_names(prefix))  # in key order
+        for prefix in ['empiar_1031', 'EMPIAR-1031', 'empiar-10310_']:
+            self.assertIn('empiar_10310_c2_tomo02', self._canonical_names(prefix))
+        self.assertEqual(['empiar_10310_aligned'], self._canonical_names('empiar-10310-al'))
+
+    def test_top_k(self):
+        self.assertEqual(['emd_18000', 'emd_1832'], self._canonical_names('emd', k=2))
+        self.assertEqual(7, len(self.index.complete('e', k=100)))
+        self.assertEqual([], self.index.complete('emd_9'))
+        self.assertEqual([], self.index.complete('x'))
+
+    def test_compact(self):
+        """names are kept as compact names whatever they were given as"""
+        for name in self.index.complete('e', k=100):
+            self.assertIsInstance(name, CompactImageName)
+        self.assertEqual('emd_1832.map', str(self.index.complete('emd_1832')[0]))  # the first is kept
+        index = complete.PrefixIndex([CompactImageName('emd_1832.map')])
+        self.assertEqual(['emd_1832'], [name.canonical_name for name in index.complete('emd')])
+
+    def test_count_and_contains(self):
+        self.assertEqual(0, self.index.count('emd_9'))
+        self.assertGreaterEqual(self.index.count('emd_18'), 3)
+        self.assertIn('EMD_1832', self.index)
+        self.assertIn('empiar-10310-c2-tomo02', self.index)
+        self.assertNotIn('emd_183', self.index)
+
+
+class TestPairing(unittest.TestCase):
+    def test_pair(self):
+        _noid = noid.mint(template='zeeeeeek')
+        result = pairing.pair(
+            [f'emd_1234-{_noid}.sff', f'EMD-1234-{_noid}.hff', f'empiar_10087_c2_tomo02-{_noid}.hff',
+             f'emd_5678-{_noid}.sff', f'empiar_10087-other-{_noid}', 'readme.txt'],
+            ['emd_1234.map', 'emd_1234.mrc', 'EMPIAR_10087_c2_tomo02.mrc', 'empiar_10087_c2_tomo03.mrc',
+             ImageName('emd_9999.map'), 'notes.txt'],
+        )
+        self.assertEqual(
+            [(f'emd_1234-{_noid}.sff', ['emd_1234.map', 'emd_1234.mrc']),
+             (f'EMD-1234-{_noid}.hff', ['emd_1234.map', 'emd_1234.mrc']),
+             (f'empiar_10087_c2_tomo02-{_noid}.hff', ['EMPIAR_10087_c2_tomo02.mrc'])],
+            [(str(annotation), list(map(str, images))) for annotation, images in result.paired]
+        )
+        self.assertEqual([f'emd_5678-{_noid}.sff', f'empiar_10087-other-{_noid}'], list(map(str, result.orphans)))
+        self.assertEqual(['empiar_10087_c2_tomo03.mrc', 'emd_9999.map'], list(map(str, result.unannotated)))
+        self.assertEqual(['notes.txt', 'readme.txt'], result.unmatched)
+        self.assertIn('3 paired annotations', str(result))
+
+    def test_order(self):
+        """unannotated images are in the order of the listing, not grouped by canonical name"""
+        _noid = noid.mint(template='zeeeeeek')
+        result = pairing.pair(
+            [f'emd_3333-{_noid}.sff'],
+            ['emd_1111.map', 'emd_2222.map', 'emd_3333.map', 'emd_1111.mrc', 'emd_2222.mrc'],
+        )
+        self.assertEqual(
+            ['emd_1111.map', 'emd_2222.map', 'emd_1111.mrc', 'emd_2222.mrc'], list(map(str, result.unannotated))
+        )
+
+    def test_empty(self):
+        result = pairing.pair([], ['emd_1234.map'])
+        self.assertEqual([], result.paired)
+        self.assertEqual(['emd_1234.map'], list(map(str, result.unannotated)))
+
+
+class TestKeys(unittest.TestCase):
+    def setUp(self):
+        self.names = [ImageName(name) for name in [
+            'empiar_10087_c2_tomo02.mrc', 'emd_15999.map', 'EMD-1234', 'test-emd_15000.map', 'readme.txt',
+            'emd_16000', 'emd_14999.map', 'emp_10087.rec', 'emd_15123',
+        ]]
+
+    def test_pack_unpack(self):
+        for name in self.names:
+            if name.matched:
+                self.assertEqual((name.archive, name.entry_id, name.is_test), keys.unpack(name.entry_key))
+        self.assertIsNone(ImageName('readme.txt').entry_key)
+        self.assertEqual(ImageName('emd_1234').entry_key, AnnotationName('emd_1234-zx0n1k6.sff').entry_key)
+        self.assertEqual(ImageName('emd_15123').entry_key, CompactImageName('emd_15123.map').entry_key)
+        self.assertLess(max(keys.key_array(self.names)), 1 << 21)
+
+    def test_sort(self):
+        self.assertEqual(
+            ['EMD-1234', 'emd_14999.map', 'test-emd_15000.map', 'emd_15123', 'emd_15999.map', 'emd_16000',
+             'empiar_10087_c2_tomo02.mrc', 'emp_10087.rec', 'readme.txt'],
+            list(map(str, keys.sort(self.names)))
+        )
+
+    def test_select_and_search(self):
+        self.assertEqual(
+            ['emd_15999.map', 'test-emd_15000.map', 'emd_15123'],
+            list(map(str, keys.select(self.names, 'emdb', 15000, 15999)))
+        )
+        sorted_keys = sorted(keys.key_array(self.names))
+        start, stop = keys.search(sorted_keys, 'emdb', 15000, 15999)
+        self.assertEqual(3, stop - start)
+        self.assertEqual((8, 8), keys.search(sorted_keys, 'empiar', 10088, 20000))
+        self.assertEqual(keys.UNMATCHED, sorted_keys[-1])
+
+    def test_bucket(self):
+        buckets = keys.bucket(self.names, size=1000)
+        self.assertEqual(
+            {('emdb', 1000): 1, ('emdb', 14000): 1, ('emdb', 15000): 3, ('emdb', 16000): 1, ('empiar', 10000): 2},
+            {bucket: len(names) for bucket, names in buckets.items()}
+        )
+
+
+class TestHardened(unittest.TestCase):
+    """hardened parsing gives the same parts in linear time and rejects names it cannot scan"""
+
+    def test_same_parts(self):
+        for name in EXOTIC_IMAGE_NAMES + ['emd_1234', 'EMD-1234.map', 'test-emd_1234.map.gz', 'emd_12', 'x', '']:
+            for cls in (ImageName, AnnotationName):
+                self.assertEqual(cls(name).to_tuple(), cls(name, hardened=True).to_tuple())
+        self.assertEqual(
+            list(parse_many(EXOTIC_IMAGE_NAMES)), list(parse_many(EXOTIC_IMAGE_NAMES, hardened=True))
+        )
+        self.assertEqual(classify('emd_1234-zx0n1k6.sff'), classify('emd_1234-zx0n1k6.sff', hardened=True))
+
+    def test_rejected(self):
+        for name in ['emd_1234' + '.' * 300, 'emd_1234\u00e9.map', 'emd_1234\n.map', 'emd_1\u0663\u0663\u0663.map']:
+            self.assertFalse(ImageName(name, hardened=True).matched, repr(name))
+            self.assertFalse(AnnotationName(name, hardened=True).matched, repr(name))
+            self.assertIsNone(classify(name, hardened=True))
+        self.assertTrue(ImageName('emd_1234\u00e9.map').matched)  # not hardened
+
+    def test_linear(self):
+        """hostile names of many thousands of characters are rejected at once"""
+        hostile = 'emd_1234' + '.' * 20000 + '\u00e9'
+        start = time.perf_counter()
+        self.assertFalse(ImageName(hostile, hardened=True).matched)
+        self.assertEqual([None], list(parse_many([hostile], kind='annotation', hardened=True)))
+        self.assertLess(time.perf_counter() - start, 0.1)
@@ -9,5 +9,14 @@ setup(
     author='Paul K. Korir, Andrii Iudin, Sriram Somasundharam',
     author_email='pkorir@ebi.ac.uk, paul.korir@gmail.com',
     description='EMDB, EMPIAR and ARIA entry names',
-    install_requires=['noid', 'requests', 'psycopg2-binary'],
+    install_requires=['noid'],
+    extras_require={
+        # names.api (the REST client)
+        'api': ['requests'],
+        # names.db (the connection pool) and names.omero over PostgreSQL
+        'db': ['psycopg2-binary'],
+        # names.accessor (columns of names)
+        'pandas': ['pandas'],
+        'all': ['requests', 'psycopg2-binary', 'pandas'],
+    },
 )